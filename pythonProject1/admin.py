@@ -0,0 +1,26 @@
+import functools
+import hmac
+import os
+
+from flask import abort, request
+
+# Access to the admin endpoints (/metrics, /tracing, /memory, /coalescing), which switch tracing on and off
+# and show process internals. They are served only to requests sending "Authorization: Bearer <ADMIN_TOKEN>",
+# e.g. curl -H "Authorization: Bearer $ADMIN_TOKEN" or Prometheus' authorization setting. Without ADMIN_TOKEN
+# they are off. The client address is not trusted: behind a reverse proxy every client looks local.
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+
+def admin_allowed():
+    if not ADMIN_TOKEN:
+        return False
+    sent = request.headers.get('Authorization', '')
+    return hmac.compare_digest(sent.encode(), f'Bearer {ADMIN_TOKEN}'.encode())
+
+# Wraps the view of an admin endpoint, answering 403 to everyone else
+def admin_only(view):
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not admin_allowed():
+            abort(403)
+        return view(*args, **kwargs)
+    return wrapper
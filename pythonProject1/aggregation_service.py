@@ -0,0 +1,168 @@
+import argparse
+import os
+import secrets
+import stat
+import tempfile
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+from aggregations import RUN_FILES, Aggregations, PandasAggregations, load_runs
+
+# Aggregation service: one process per host owns the runs and their indexes and answers the queries
+# of all Dash workers over a local Unix socket, e.g.
+#
+#   python aggregation_service.py
+#   AGGREGATION_BACKEND=service gunicorn wsgi:server
+#
+# The workers then hold no data and their restarts do not reload it.
+#
+# Requests and results are pickled, so both ends authenticate each other with a shared key before anything
+# is unpickled: AGGREGATION_SERVICE_KEY, or else a key file next to the socket that the service writes on its
+# first start. The socket defaults to $XDG_RUNTIME_DIR, or a directory in the temp dir only this user can
+# enter; AGGREGATION_SERVICE or --socket pick another path, which should be in a private directory as well.
+
+AGGREGATION_SERVICE_KEY = os.environ.get('AGGREGATION_SERVICE_KEY')
+
+SERVICE_METHODS = {'runs', 'vehicles', 'stations', 'times', 'query', 'kpis', 'vehicle_store', 'station_store',
+                   'memory_usage'}
+
+# $XDG_RUNTIME_DIR, or a directory in the temp dir created for this user, refused when someone else could enter it
+def private_directory():
+    runtime = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime:
+        return runtime
+    directory = os.path.join(tempfile.gettempdir(), f'dashdemo-{os.getuid()}')
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    status = os.lstat(directory)
+    if not stat.S_ISDIR(status.st_mode) or status.st_uid != os.getuid() or status.st_mode & 0o077:
+        raise RuntimeError(f'{directory} is not a private directory of this user; '
+                           'set XDG_RUNTIME_DIR or AGGREGATION_SERVICE to a socket path in one')
+    return directory
+
+def default_socket():
+    return os.path.join(private_directory(), 'dashdemo-aggregations.sock')
+
+# The key both ends authenticate with. The key file is created by the service and must be readable by
+# this user only, so nobody else can have written or read it.
+def service_key(address, create=False):
+    if AGGREGATION_SERVICE_KEY:
+        return AGGREGATION_SERVICE_KEY.encode()
+    path = address + '.key'
+    if create:
+        try:
+            with os.fdopen(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), 'w') as file:
+                file.write(secrets.token_hex(32))
+        except FileExistsError:
+            pass
+    with open(path) as file:
+        status = os.fstat(file.fileno())
+        if status.st_uid != os.getuid() or status.st_mode & 0o077:
+            raise RuntimeError(f'{path} must belong to this user and be readable by it only')
+        return file.read().strip().encode()
+
+# Answers the queries of one worker connection until it is closed
+def handle(aggregations, connection):
+    with connection:
+        while True:
+            try:
+                method, args = connection.recv()
+            except (EOFError, OSError):
+                return
+            if method not in SERVICE_METHODS:
+                connection.send(('error', ValueError(f'unknown aggregation {method!r}')))
+                continue
+            try:
+                connection.send(('ok', getattr(aggregations, method)(*args)))
+            except Exception as error:
+                connection.send(('error', error))
+
+def serve(aggregations, address):
+    key = service_key(address, create=True)
+    if os.path.exists(address):
+        os.unlink(address)
+    # Only the owner may connect
+    umask = os.umask(0o177)
+    try:
+        listener = Listener(address, family='AF_UNIX', authkey=key)
+    finally:
+        os.umask(umask)
+    print(f'aggregation service listening on {address}', flush=True)
+    with listener:
+        while True:
+            try:
+                connection = listener.accept()
+            except (AuthenticationError, EOFError, OSError):
+                continue
+            threading.Thread(target=handle, args=(aggregations, connection), daemon=True).start()
+
+# Backend querying the aggregation service instead of aggregating in the Dash worker.
+# Every thread has its own connection, so the runs of one callback are still queried in parallel.
+class ServiceAggregations(Aggregations):
+    def __init__(self, address=None):
+        self.address = address or default_socket()
+        self.local = threading.local()
+
+    def connection(self):
+        if getattr(self.local, 'pid', None) != os.getpid():
+            self.local.connection = Client(self.address, family='AF_UNIX', authkey=service_key(self.address))
+            self.local.pid = os.getpid()
+        return self.local.connection
+
+    def call(self, method, *args):
+        try:
+            connection = self.connection()
+            connection.send((method, args))
+            status, result = connection.recv()
+        except (EOFError, OSError):
+            # The service restarted; connect again once
+            self.local.pid = None
+            connection = self.connection()
+            connection.send((method, args))
+            status, result = connection.recv()
+        if status == 'error':
+            raise result
+        return result
+
+    def runs(self):
+        return self.call('runs')
+
+    def vehicles(self):
+        return self.call('vehicles')
+
+    def stations(self):
+        return self.call('stations')
+
+    def times(self, dataset):
+        return self.call('times', dataset)
+
+    def query(self, dataset, aggregates, vehicle=None, cp=None, window=None, positive=None):
+        return self.call('query', dataset, aggregates, vehicle, cp, window, positive)
+
+    def kpis(self, dataset):
+        return self.call('kpis', dataset)
+
+    def vehicle_store(self):
+        return self.call('vehicle_store')
+
+    def station_store(self):
+        return self.call('station_store')
+
+    # The runs and aggregates are held by the service process, once for all workers
+    def memory_usage(self):
+        return {'aggregation service': {f'{group}: {name}': size
+                                        for group, sizes in self.call('memory_usage').items()
+                                        for name, size in sizes.items()}}
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the dashboard aggregations over a Unix socket')
+    parser.add_argument('--socket', default=os.environ.get('AGGREGATION_SERVICE'),
+                        help='path of the Unix socket, by default in $XDG_RUNTIME_DIR or a private temp directory')
+    args = parser.parse_args()
+    serve(PandasAggregations(load_runs(RUN_FILES)), args.socket or default_socket())
+
+if __name__ == '__main__':
+    main()
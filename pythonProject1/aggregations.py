@@ -0,0 +1,194 @@
+import numpy as np
+import pandas as pd
+
+from client_data import build_vehicle_store, build_station_store
+from memory_report import deep_size
+from startup_profile import mark
+from tracing import span
+
+# Simulation runs shown by the dashboard
+RUN_FILES = {'df1': 'result1.csv', 'df2': 'result2.csv'}
+
+# Columns of a preprocessed run the query backends read, and those written with decimal commas
+COLUMNS = ['time', 'type', 'cp', 'cp_target_power', 'cp_charging_rate', 'vehicle', 'vehicle_soc', 'vehicle_charge',
+           'vehicle_capacity', 'cp_charge_increment']
+NUMBERS = ['cp_target_power', 'cp_charging_rate', 'vehicle_soc', 'vehicle_charge', 'vehicle_capacity',
+           'cp_charge_increment']
+
+def preprocess(df):
+    df['time'] = df['time'].astype(int)
+    df['vehicle'] = df['vehicle'].str.replace(',', '.').astype(float)
+    df = df.dropna(subset=['vehicle']).copy()
+    df['vehicle'] = df['vehicle'].astype(int)
+    df['cp_charging_rate'] = df['cp_charging_rate'].str.replace(',', '.').astype(float)
+    df['cp_target_power'] = df['cp_target_power'].str.replace(',', '.').astype(float)
+    df['vehicle_soc'] = df['vehicle_soc'].str.replace(',', '.').astype(float)
+    df['vehicle_charge'] = df['vehicle_charge'].str.replace(',', '.').astype(float)
+    df['vehicle_capacity'] = df['vehicle_capacity'].str.replace(',', '.').astype(float)
+    df['cp_charge_increment'] = df['cp_charge_increment'].str.replace(',', '.').astype(float)
+    df['time_minute'] = df['time'] / 60
+    df['time_of_day'] = pd.to_datetime(df['time'], unit='s', utc=True).map(lambda x: x.tz_convert("Europe/Berlin"))
+    return df
+
+# time_of_day of simulation seconds, as preprocess() derives it
+def time_of_day(times):
+    index = pd.to_datetime(np.asarray(times, dtype='int64'), unit='s', utc=True).tz_convert('Europe/Berlin')
+    return index.rename('time_of_day')
+
+def load_runs(run_files=RUN_FILES):
+    data_map = {}
+    for dataset, path in run_files.items():
+        df = pd.read_csv(path, delimiter=';')
+        mark(f'read_csv {dataset}')
+        data_map[dataset] = preprocess(df)
+        mark(f'preprocess {dataset}')
+    return data_map
+
+def calculate_kpis(df):
+    total_energy_used = df['cp_charge_increment'].sum()
+    cars_charged = df[df['vehicle_charge'] > 0]['vehicle'].nunique()
+    cars_not_charged = df[df['vehicle_charge'] == 0]['vehicle'].nunique()
+
+    # Filter cars that have the last 3 entries with cp_charge_increment, cp_charging_rate, and cp_target_power as zero
+    last_3_entries = df.groupby('vehicle').tail(3)
+    condition = (last_3_entries['cp_charge_increment'] == 0) & (last_3_entries['cp_charging_rate'] == 0) & (
+                last_3_entries['cp_target_power'] == 0)
+    vehicles_stopped_charging = last_3_entries[condition].groupby('vehicle').filter(lambda x: len(x) == 3)[
+        'vehicle'].unique()
+
+    df_stopped_charging = df[df['vehicle'].isin(vehicles_stopped_charging)]
+    avg_soc_ac = df_stopped_charging.groupby('vehicle').tail(1)['vehicle_soc'].mean()
+    median_soc = df_stopped_charging.groupby('vehicle').tail(1)['vehicle_soc'].median()
+
+    first_entries = df.groupby('vehicle').head(1)
+    avg_soc_bc = first_entries['vehicle_soc'].mean()
+
+    return total_energy_used, cars_charged, cars_not_charged, avg_soc_ac, median_soc, avg_soc_bc
+
+# Series the dashboard shows, as (column, aggregation) per time of day. cumsum sums every time of day
+# and accumulates the sums over the day.
+INFRASTRUCTURE_QUERIES = {
+    'target_power': ('cp_target_power', 'sum'),
+    'charging_rate': ('cp_charging_rate', 'sum'),
+    'total_energy': ('cp_charge_increment', 'cumsum'),
+    'cars_charging': ('vehicle', 'nunique'),
+}
+SERIES_QUERIES = {
+    'target_power': ('cp_target_power', 'mean'),
+    'charging_rate': ('cp_charging_rate', 'mean'),
+    'soc': ('vehicle_soc', 'mean'),
+    'total_energy': ('cp_charge_increment', 'cumsum'),
+}
+STATION_OPTIONS = ('target_power', 'charging_rate')
+
+# The dashboard's queries, in terms of the one primitive every backend implements:
+#
+#   query(dataset, aggregates, vehicle=None, cp=None, window=None, positive=None)
+#
+# aggregates maps names to (column, aggregation) with aggregation one of sum, mean, nunique or cumsum.
+# Rows can be limited to one vehicle or charge point, to a window (start, end) of simulation seconds,
+# start included, and to rows where the column named by positive is above zero.
+# It returns {name: Series indexed by time of day} as PandasAggregations computes it; engines adding floats in
+# another order may differ in the last digits, see same_results().
+# Backends also answer runs, vehicles, stations, times, kpis, vehicle_store, station_store and memory_usage.
+# Relative difference allowed between the float results of two backends
+RELATIVE_TOLERANCE = 1e-9
+
+# Whether a backend's series or KPIs agree with pandas': the same index, counts and missing values, and floats
+# within RELATIVE_TOLERANCE
+def same_results(expected, actual):
+    try:
+        pd.testing.assert_series_equal(pd.Series(expected), pd.Series(actual), check_exact=False,
+                                       rtol=RELATIVE_TOLERANCE, atol=RELATIVE_TOLERANCE)
+    except AssertionError:
+        return False
+    return True
+
+class Aggregations:
+    def infrastructure_series(self, dataset, option, window=None):
+        positive = 'cp_charging_rate' if option == 'cars_charging' else None
+        return self.query(dataset, {option: INFRASTRUCTURE_QUERIES[option]}, window=window, positive=positive)[option]
+
+    def vehicle_series(self, dataset, vehicle, options, window=None):
+        if vehicle is None:
+            raise ValueError('vehicle_series needs a vehicle; None would select every vehicle')
+        aggregates = {option: SERIES_QUERIES[option] for option in options if option in SERIES_QUERIES}
+        series = self.query(dataset, aggregates, vehicle=vehicle, window=window)
+        if 'soc' in series:
+            series['soc'] = series['soc'] * 100
+        return series
+
+    def station_series(self, dataset, station, options, window=None):
+        if station is None:
+            raise ValueError('station_series needs a station; None would select every station')
+        aggregates = {option: SERIES_QUERIES[option] for option in options if option in STATION_OPTIONS}
+        return self.query(dataset, aggregates, cp=station, window=window)
+
+# Reference backend: answers the queries from the runs held in this process.
+# The row positions of every vehicle and charge point are indexed once.
+class PandasAggregations(Aggregations):
+    def __init__(self, data_map):
+        self.data_map = data_map
+        self.vehicle_rows = {dataset: df.groupby('vehicle').indices for dataset, df in data_map.items()}
+        self.station_rows = {dataset: df.groupby('cp').indices for dataset, df in data_map.items()}
+
+    def runs(self):
+        return list(self.data_map)
+
+    def vehicles(self):
+        return pd.concat([df['vehicle'] for df in self.data_map.values()]).unique().tolist()
+
+    def stations(self):
+        return pd.concat([df['cp'] for df in self.data_map.values()]).unique().tolist()
+
+    def times(self, dataset):
+        return self.data_map[dataset]['time_of_day'].unique()
+
+    def query(self, dataset, aggregates, vehicle=None, cp=None, window=None, positive=None):
+        df = self.data_map[dataset]
+        with span('filter'):
+            rows = None
+            if vehicle is not None:
+                rows = self.vehicle_rows[dataset].get(vehicle, [])
+            if cp is not None:
+                cp_rows = self.station_rows[dataset].get(cp, [])
+                rows = cp_rows if rows is None else np.intersect1d(rows, cp_rows)
+            if rows is not None:
+                df = df.iloc[rows]
+            if window is not None:
+                df = df[(df['time'] >= window[0]) & (df['time'] < window[1])]
+            if positive is not None:
+                df = df[df[positive] > 0]
+        series = {}
+        for name, (column, how) in aggregates.items():
+            if how == 'cumsum':
+                with span('sort'):
+                    df_sorted = df.sort_values(by='time_of_day')
+                with span('groupby'):
+                    total = df_sorted.groupby('time_of_day')[column].sum()
+                with span('cumsum'):
+                    series[name] = total.cumsum()
+            else:
+                with span('groupby'):
+                    series[name] = df.groupby('time_of_day')[column].agg(how)
+        return series
+
+    def kpis(self, dataset):
+        return calculate_kpis(self.data_map[dataset])
+
+    def vehicle_store(self):
+        return build_vehicle_store(self.data_map)
+
+    def station_store(self):
+        return build_station_store(self.data_map)
+
+    # Bytes of the run frames and of the row indexes precomputed from them
+    def memory_usage(self):
+        aggregates = {}
+        for dataset in self.data_map:
+            aggregates[f'vehicle rows {dataset}'] = deep_size(self.vehicle_rows[dataset])
+            aggregates[f'station rows {dataset}'] = deep_size(self.station_rows[dataset])
+        return {
+            'runs': {dataset: deep_size(df) for dataset, df in self.data_map.items()},
+            'aggregates': aggregates,
+        }
@@ -0,0 +1,135 @@
+(function() {
+    // Figure dict as built by themes.make_figure on the server
+    function makeFigure(context, traces, title, yaxis) {
+        return {
+            data: traces,
+            layout: {
+                title: {text: title},
+                xaxis: {title: {text: 'Time'}},
+                yaxis: yaxis,
+                meta: {
+                    separate: Object.keys(context.runs).map(function(run) {
+                        return {run: run, title: title + ' (' + context.runs[run] + ')'};
+                    })
+                }
+            }
+        };
+    }
+
+    // Step series of one vehicle or station in one run, from the store built by client_data.py
+    function seriesTrace(store, run, key, column, name, line) {
+        var entry = store.series[run][key];
+        var times = store.times[run];
+        return {
+            type: 'scatter',
+            mode: 'lines',
+            name: name,
+            meta: run,
+            line: line,
+            x: entry ? entry.t.map(function(index) { return times[index]; }) : [],
+            y: entry ? entry[column] : []
+        };
+    }
+
+    function powerTraces(store, context, key, toggle) {
+        var traces = [];
+        Object.keys(context.runs).forEach(function(run) {
+            if (toggle.indexOf('target_power') !== -1) {
+                traces.push(seriesTrace(store, run, key, 'target_power', context.runs[run] + ' - CP Target Power',
+                                        {dash: 'solid', shape: 'hv'}));
+            }
+            if (toggle.indexOf('charging_rate') !== -1) {
+                traces.push(seriesTrace(store, run, key, 'charging_rate', context.runs[run] + ' - CP Charging Rate',
+                                        {dash: 'solid', shape: 'hv'}));
+            }
+        });
+        return traces;
+    }
+
+    function runTraces(store, context, key, column, label) {
+        return Object.keys(context.runs).map(function(run) {
+            return seriesTrace(store, run, key, column, context.runs[run] + ' - ' + label, {shape: 'hv'});
+        });
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        navigation: {
+            // Returns the prebuilt layout of the page in the session's theme, the dashboard for unknown paths
+            display_page: function(pathname, theme, layouts) {
+                return layouts[theme][pathname] || layouts[theme]['/Dash'];
+            },
+
+            theme_class: function(theme) {
+                return 'theme-' + theme;
+            },
+
+            active_link: function(pathname) {
+                var links = ['/Dash', '/charging-infrastructure', '/cars', '/charging-station'];
+                var active = links.indexOf(pathname) > 0 ? pathname : '/Dash';
+                return links.map(function(link) {
+                    return link === active ? 'nav-link active' : 'nav-link';
+                });
+            }
+        },
+
+        views: {
+            // Lays out the combined figures sent by the server as graphs in the session's theme.
+            // The separate view splits every figure into one graph per run, using the run each
+            // trace is tagged with in meta.
+            arrange: function(figures, view, theme, templates) {
+                if (!figures) {
+                    return [];
+                }
+                var template = templates[theme];
+                var arranged = [];
+                figures.forEach(function(figure) {
+                    if (view !== 'separate') {
+                        arranged.push({data: figure.data, layout: Object.assign({}, figure.layout, {template: template})});
+                        return;
+                    }
+                    figure.layout.meta.separate.forEach(function(part) {
+                        arranged.push({
+                            data: figure.data.filter(function(trace) {
+                                return trace.meta === part.run;
+                            }),
+                            layout: Object.assign({}, figure.layout, {template: template, title: {text: part.title}})
+                        });
+                    });
+                });
+                return arranged.map(function(figure) {
+                    return {
+                        type: 'Graph',
+                        namespace: 'dash_core_components',
+                        props: {figure: figure}
+                    };
+                });
+            }
+        },
+
+        // Browser-side counterparts of update_car_graph and update_station_graph
+        series: {
+            cars: function(vehicle, toggle, store, context) {
+                var figures = [];
+                if (toggle.indexOf('target_power') !== -1 || toggle.indexOf('charging_rate') !== -1) {
+                    figures.push(makeFigure(context, powerTraces(store, context, vehicle, toggle),
+                                            'Power Consumption EV ' + vehicle, context.axes.power));
+                }
+                if (toggle.indexOf('soc') !== -1) {
+                    figures.push(makeFigure(context, runTraces(store, context, vehicle, 'soc', 'State of Charge'),
+                                            'State of Charge EV ' + vehicle, context.axes.soc));
+                }
+                if (toggle.indexOf('total_energy') !== -1) {
+                    figures.push(makeFigure(context,
+                                            runTraces(store, context, vehicle, 'total_energy', 'Cumulative Total Energy Used'),
+                                            'Energy Used EV ' + vehicle, context.axes.energy));
+                }
+                return figures;
+            },
+
+            stations: function(station, toggle, store, context) {
+                return [makeFigure(context, powerTraces(store, context, station, toggle),
+                                   'Power Usage of Charging Station ' + station, context.axes.power)];
+            }
+        }
+    });
+})();
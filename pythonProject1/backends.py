@@ -0,0 +1,43 @@
+import os
+
+from aggregation_service import ServiceAggregations
+from aggregations import RUN_FILES, PandasAggregations, load_runs
+
+# Query backends answering the dashboard's aggregations, see aggregations.Aggregations for the query API.
+# AGGREGATION_BACKEND picks one; pandas is the reference the others must match.
+#
+#   pandas   the runs are loaded and aggregated in this process
+#   service  a running aggregation_service.py holds the runs for all workers, at AGGREGATION_SERVICE or its
+#            default socket
+#   duckdb   the embedded DuckDB engine queries Parquet copies of the runs, see duckdb_backend.py
+#   polars   the lazy, multi-threaded polars engine aggregates the runs in this process, see polars_backend.py
+
+AGGREGATION_SERVICE = os.environ.get('AGGREGATION_SERVICE')
+AGGREGATION_BACKEND = os.environ.get('AGGREGATION_BACKEND', 'service' if AGGREGATION_SERVICE else 'pandas')
+
+def create_pandas_backend(run_files):
+    return PandasAggregations(load_runs(run_files))
+
+def create_service_backend(run_files):
+    return ServiceAggregations(AGGREGATION_SERVICE)
+
+# The other backends are imported only when picked; their engines cost memory and startup time in every worker
+def create_duckdb_backend(run_files):
+    from duckdb_backend import create_duckdb_aggregations
+    return create_duckdb_aggregations(run_files)
+
+def create_polars_backend(run_files):
+    from polars_backend import create_polars_aggregations
+    return create_polars_aggregations(run_files)
+
+BACKENDS = {
+    'pandas': create_pandas_backend,
+    'service': create_service_backend,
+    'duckdb': create_duckdb_backend,
+    'polars': create_polars_backend,
+}
+
+def create_aggregations(backend=AGGREGATION_BACKEND, run_files=RUN_FILES):
+    if backend not in BACKENDS:
+        raise ValueError(f'unknown aggregation backend {backend!r}, choose one of {", ".join(BACKENDS)}')
+    return BACKENDS[backend](run_files)
@@ -0,0 +1,36 @@
+import os
+
+from dash import DiskcacheManager
+
+from backends import AGGREGATION_BACKEND
+
+try:
+    import diskcache
+except ImportError:
+    diskcache = None
+
+# Run heavy callbacks as background jobs in separate processes, so they do not block the web workers.
+# Jobs and results go through a local disk cache, no broker is needed.
+#
+# Every job runs in a process forked for it and gone when it ends, so what a job caches in memory is lost:
+# the trace cache and coalescing of the web workers do not apply to background callbacks. Their results are
+# cached by the manager instead, keyed by the callback's inputs and by cache_by, e.g. the version of the runs.
+BACKGROUND_CALLBACKS = os.environ.get('BACKGROUND_CALLBACKS') == '1'
+BACKGROUND_CACHE_DIR = os.environ.get('BACKGROUND_CACHE_DIR', '.background-cache')
+# Seconds a cached result is kept after it was last used
+BACKGROUND_CACHE_EXPIRE = int(os.environ.get('BACKGROUND_CACHE_EXPIRE', 24 * 3600))
+
+# Size and modification time of every file, for cache_by
+def files_version(paths):
+    return [(path, os.stat(path).st_size, os.stat(path).st_mtime_ns) for path in paths]
+
+def create_background_manager(cache_by=None, backend=AGGREGATION_BACKEND):
+    if not BACKGROUND_CALLBACKS:
+        return None
+    # Jobs are forked from the web worker, and a loaded polars backend fails in forked processes
+    if backend == 'polars':
+        raise ValueError('BACKGROUND_CALLBACKS=1 cannot be used with AGGREGATION_BACKEND=polars, whose runs do not '
+                         'survive the fork of a background job; see polars_backend.py')
+    if diskcache is None:
+        raise ImportError('BACKGROUND_CALLBACKS=1 needs diskcache: pip install "dash[diskcache]"')
+    return DiskcacheManager(diskcache.Cache(BACKGROUND_CACHE_DIR), cache_by=cache_by, expire=BACKGROUND_CACHE_EXPIRE)
@@ -0,0 +1,258 @@
+import argparse
+import atexit
+import importlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from aggregations import (INFRASTRUCTURE_QUERIES, RUN_FILES, SERIES_QUERIES, STATION_OPTIONS, PandasAggregations,
+                          preprocess, same_results)
+from trace_cache import trace_cache
+
+# Times preprocess, calculate_kpis and the graph callbacks on the sample runs scaled up by
+# replicating their vehicles and charge points, and compares them against a stored baseline, e.g.
+#
+#   python benchmark.py --scales 1 10 --save-baseline
+#   python benchmark.py --scales 1 10 --threshold 0.2
+#   python benchmark.py --scales 10 100 --backends pandas duckdb polars
+#
+# With several --backends the KPI and callback cases run on each query backend over the same runs, named
+# backend:case for all but pandas, and each backend's results are checked against pandas', see
+# aggregations.same_results().
+# Callbacks are timed with an empty trace cache unless the case name ends in -cached.
+# Cases are compared by their fastest call, the least noisy statistic. Exits with status 1 when a case
+# is slower than the baseline by more than the threshold and by more than the noise floor, or when a backend's
+# results differ from pandas'.
+
+INFRASTRUCTURE_TOGGLES = {
+    'all': ['total_energy', 'target_power', 'charging_rate', 'grid_limit', 'cars_charging'],
+    'power': ['target_power', 'charging_rate', 'grid_limit'],
+    'energy': ['total_energy'],
+}
+CAR_TOGGLES = {
+    'all': ['total_energy', 'soc', 'target_power', 'charging_rate'],
+    'power': ['target_power', 'charging_rate'],
+}
+STATION_TOGGLES = {
+    'all': ['target_power', 'charging_rate'],
+}
+
+# The DuckDB backend over the scaled runs, written to Parquet files removed on exit
+def create_duckdb_backend(data_map):
+    from duckdb_backend import duckdb_aggregations_from_pandas
+    directory = tempfile.mkdtemp(prefix='benchmark-parquet-')
+    atexit.register(shutil.rmtree, directory, ignore_errors=True)
+    return duckdb_aggregations_from_pandas(data_map, directory)
+
+def create_polars_backend(data_map):
+    from polars_backend import polars_aggregations_from_pandas
+    return polars_aggregations_from_pandas(data_map)
+
+# Query backends the benchmark can build over runs already loaded into pandas frames
+BENCHMARK_BACKENDS = {
+    'pandas': PandasAggregations,
+    'duckdb': create_duckdb_backend,
+    'polars': create_polars_backend,
+}
+
+# Copies of a run with the vehicle and charge point ids of every copy shifted past those of the previous one
+def scale_run(df, factor):
+    vehicle_step = df['vehicle'].max() + 1
+    cp_step = df['cp'].max() + 1
+    copies = []
+    for copy in range(factor):
+        part = df.copy()
+        part['vehicle'] += copy * vehicle_step
+        part['cp'] += copy * cp_step
+        copies.append(part)
+    return pd.concat(copies, ignore_index=True)
+
+def measure(function, repeats):
+    function()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return {'median': statistics.median(times), 'min': min(times), 'repeats': repeats}
+
+# The raw runs replicated scale times, and the preprocessed runs scaled up to as many vehicles and charge points
+def scaled_runs(raw_runs, scale):
+    raw = {dataset: pd.concat([df] * scale, ignore_index=True) for dataset, df in raw_runs.items()}
+    data_map = {dataset: scale_run(preprocess(df.copy()), scale) for dataset, df in raw_runs.items()}
+    return raw, data_map
+
+# (name, function) for every benchmark case of one backend over the scaled runs
+def list_cases(design, raw, data_map, backend='pandas'):
+    runs = list(data_map)
+    vehicle = data_map[runs[0]]['vehicle'].iloc[0]
+    station = data_map[runs[0]]['cp'].iloc[0]
+
+    def use_data():
+        design.aggregations = BENCHMARK_BACKENDS[backend](data_map)
+        trace_cache.clear()
+
+    def cold(function):
+        def call():
+            trace_cache.clear()
+            return function()
+        return call
+
+    cases = []
+    if backend == 'pandas':
+        cases += [(f'preprocess/{dataset}', lambda df=df: preprocess(df.copy())) for dataset, df in raw.items()]
+    cases += [(f'calculate_kpis/{dataset}', lambda dataset=dataset: design.aggregations.kpis(dataset)) for dataset in runs]
+    for name, toggle in INFRASTRUCTURE_TOGGLES.items():
+        cases.append((f'update_infrastructure_graph/{name}',
+                      cold(lambda toggle=toggle: design.update_infrastructure_graph(runs, toggle, None))))
+    rendered = {'data': runs, 'graph': INFRASTRUCTURE_TOGGLES['all']}
+    cases.append(('update_infrastructure_graph/patch',
+                  cold(lambda: design.update_infrastructure_graph(runs, INFRASTRUCTURE_TOGGLES['power'], rendered))))
+    cases.append(('update_infrastructure_graph/all-cached',
+                  lambda: design.update_infrastructure_graph(runs, INFRASTRUCTURE_TOGGLES['all'], None)))
+    for name, toggle in CAR_TOGGLES.items():
+        cases.append((f'update_car_graph/{name}', cold(lambda toggle=toggle: design.update_car_graph(vehicle, toggle))))
+    for name, toggle in STATION_TOGGLES.items():
+        cases.append((f'update_station_graph/{name}',
+                      cold(lambda toggle=toggle: design.update_station_graph(station, toggle))))
+    return use_data, cases
+
+def case_name(backend, name, scale):
+    return f'{name}@x{scale}' if backend == 'pandas' else f'{backend}:{name}@x{scale}'
+
+# Results of every query and KPI the cases make, per query backend, that differ from pandas'
+def count_differences(reference, other, data_map):
+    runs = list(data_map)
+    vehicle = data_map[runs[0]]['vehicle'].iloc[0]
+    station = data_map[runs[0]]['cp'].iloc[0]
+    differences = []
+    for dataset in runs:
+        for option in INFRASTRUCTURE_QUERIES:
+            expected = reference.infrastructure_series(dataset, option)
+            if not same_results(expected, other.infrastructure_series(dataset, option)):
+                differences.append(f'{dataset} infrastructure {option}')
+        expected = reference.vehicle_series(dataset, vehicle, list(SERIES_QUERIES))
+        for option, series in other.vehicle_series(dataset, vehicle, list(SERIES_QUERIES)).items():
+            if not same_results(expected[option], series):
+                differences.append(f'{dataset} vehicle {option}')
+        expected = reference.station_series(dataset, station, STATION_OPTIONS)
+        for option, series in other.station_series(dataset, station, STATION_OPTIONS).items():
+            if not same_results(expected[option], series):
+                differences.append(f'{dataset} station {option}')
+        if not same_results(reference.kpis(dataset), other.kpis(dataset)):
+            differences.append(f'{dataset} kpis')
+    return differences
+
+# Every backend's fastest calls next to pandas'
+def compare_backends(results, backends):
+    for backend in backends:
+        if backend == 'pandas':
+            continue
+        print(f'\n{backend} against pandas:')
+        for name, result in results.items():
+            if name.startswith(f'{backend}:') and name.split(':', 1)[1] in results:
+                reference = results[name.split(':', 1)[1]]['min']
+                print(f'{name.split(":", 1)[1]:<55} {reference * 1000:10.2f} ms  {result["min"] * 1000:10.2f} ms  '
+                      f'{reference / result["min"]:6.2f}x')
+
+def compare(results, baseline, threshold, noise_floor):
+    regressions = []
+    for name, result in sorted(results.items()):
+        previous = baseline.get(name)
+        if previous is None:
+            print(f'{name:<55} {result["min"] * 1000:10.2f} ms  (new)')
+            continue
+        change = result['min'] / previous['min'] - 1
+        slower = result['min'] - previous['min']
+        flag = ' REGRESSION' if change > threshold and slower > noise_floor else ''
+        print(f'{name:<55} {result["min"] * 1000:10.2f} ms  {change:+7.1%}{flag}')
+        if flag:
+            regressions.append(name)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark preprocessing, KPIs and the graph callbacks')
+    parser.add_argument('--design', default='dashboard', help='dashboard module whose callbacks are timed')
+    parser.add_argument('--scales', nargs='+', type=int, default=[1, 10], help='replication factors of the sample runs')
+    parser.add_argument('--repeats', type=int, default=7, help='timed calls per case')
+    parser.add_argument('--filter', default='', help='only run cases whose name contains this')
+    parser.add_argument('--backends', nargs='+', default=['pandas'], choices=list(BENCHMARK_BACKENDS),
+                        help='query backends to time the KPIs and callbacks on')
+    parser.add_argument('--out', default='benchmark-results.json', help='file the results are written to')
+    parser.add_argument('--baseline', default='benchmark-baseline.json', help='stored results to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed slowdown, 0.2 = 20%%')
+    parser.add_argument('--noise-floor', type=float, default=0.5, help='slowdowns below this many ms are ignored')
+    parser.add_argument('--save-baseline', action='store_true', help='store these results as the new baseline')
+    args = parser.parse_args()
+
+    design = importlib.import_module(args.design)
+    raw_runs = {dataset: pd.read_csv(path, delimiter=';') for dataset, path in RUN_FILES.items()}
+
+    results = {}
+    differences = {}
+    for scale in args.scales:
+        raw, data_map = scaled_runs(raw_runs, scale)
+        rows = sum(len(df) for df in data_map.values())
+        for backend in args.backends:
+            use_data, cases = list_cases(design, raw, data_map, backend)
+            try:
+                use_data()
+            except ImportError as error:
+                parser.error(str(error))
+            if backend != 'pandas':
+                found = count_differences(PandasAggregations(data_map), design.aggregations, data_map)
+                differences[f'{backend}@x{scale}'] = found
+                print(f'{backend}@x{scale}: {len(found)} results differ from pandas {found}', flush=True)
+            for name, function in cases:
+                name = case_name(backend, name, scale)
+                if args.filter in name:
+                    results[name] = dict(measure(function, args.repeats), rows=rows)
+                    print(f'{name:<55} {results[name]["min"] * 1000:10.2f} ms  median {results[name]["median"] * 1000:.2f} ms',
+                          flush=True)
+    compare_backends(results, args.backends)
+
+    output = {
+        'meta': {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'duckdb': getattr(sys.modules.get('duckdb'), '__version__', None),
+            'polars': getattr(sys.modules.get('polars'), '__version__', None),
+            'machine': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'results': results,
+        'differences': differences,
+    }
+    with open(args.out, 'w') as file:
+        json.dump(output, file, indent=1)
+    different = [name for name, found in differences.items() if found]
+    if different:
+        print(f'results of {", ".join(different)} differ from pandas')
+        sys.exit(1)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump(output, file, indent=1)
+        print(f'baseline written to {args.baseline}')
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f'no baseline at {args.baseline}; run with --save-baseline to store one')
+        return
+    with open(args.baseline) as file:
+        baseline = json.load(file)['results']
+    print(f'\ncompared with {args.baseline} (threshold {args.threshold:.0%}):')
+    regressions = compare(results, baseline, args.threshold, args.noise_floor / 1000)
+    if regressions:
+        print(f'{len(regressions)} regressions')
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
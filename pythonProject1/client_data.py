@@ -0,0 +1,47 @@
+import numpy as np
+
+# Compact per-run columnar series shipped once to the browser, so the Cars and Charging Station
+# pages can rebuild their traces on a dropdown change without a server round-trip.
+#
+# {'times': {run: [iso time, ...]},
+#  'series': {run: {key: {'t': [index into times, ...], column: [value, ...], ...}}}}
+def build_series_store(data_map, key, columns):
+    store = {'times': {}, 'series': {}}
+    for dataset, df in data_map.items():
+        times = np.sort(df['time_of_day'].unique())
+        store['times'][dataset] = [time.isoformat() for time in times]
+
+        grouped = df.groupby([key, 'time_of_day'])
+        aggregated = {}
+        for column, (source, how, scale) in columns.items():
+            aggregated[column] = grouped[source].agg('sum' if how == 'cumsum' else how) * scale
+
+        series = {}
+        index = next(iter(aggregated.values())).index
+        positions = np.searchsorted(times, index.get_level_values('time_of_day'))
+        for value in index.get_level_values(0).unique():
+            rows = index.get_loc(value)
+            entry = {'t': positions[rows].tolist()}
+            for column, values in aggregated.items():
+                values = values.iloc[rows]
+                # Plain cumsum per key, as on the server; groupby().cumsum() rounds differently
+                if columns[column][1] == 'cumsum':
+                    values = values.cumsum()
+                entry[column] = values.tolist()
+            series[str(value)] = entry
+        store['series'][dataset] = series
+    return store
+
+def build_vehicle_store(data_map):
+    return build_series_store(data_map, 'vehicle', {
+        'target_power': ('cp_target_power', 'mean', 1),
+        'charging_rate': ('cp_charging_rate', 'mean', 1),
+        'soc': ('vehicle_soc', 'mean', 100),
+        'total_energy': ('cp_charge_increment', 'cumsum', 1),
+    })
+
+def build_station_store(data_map):
+    return build_series_store(data_map, 'cp', {
+        'target_power': ('cp_target_power', 'mean', 1),
+        'charging_rate': ('cp_charging_rate', 'mean', 1),
+    })
@@ -0,0 +1,88 @@
+import functools
+import json
+import threading
+
+from flask import jsonify
+
+from admin import admin_only
+from memory_report import deep_size
+from shared_state import SharedCounters, add_counters
+
+# Single-flight coalescing of identical concurrent callback calls: the first call with a set of inputs
+# computes the result, calls with the same inputs arriving meanwhile wait for it and share it.
+# Coalescing is per process; its counters are reported summed over all gunicorn workers, see shared_state.py.
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    def __init__(self, name):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.counters = {}
+        self.shared = SharedCounters(name, self.stats, add_counters)
+
+    def do(self, name, key, function, *args):
+        with self.lock:
+            counters = self.counters.setdefault(name, {'computed': 0, 'coalesced': 0})
+            call = self.calls.get((name, key))
+            leader = call is None
+            if leader:
+                call = self.calls[(name, key)] = _Call()
+                counters['computed'] += 1
+            else:
+                counters['coalesced'] += 1
+        self.shared.changed()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function(*args)
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self.lock:
+                del self.calls[(name, key)]
+            call.done.set()
+        return call.result
+
+    def stats(self):
+        with self.lock:
+            return {name: dict(counters) for name, counters in self.counters.items()}
+
+single_flight = SingleFlight('coalescing')
+
+# Coalesced calls of all workers count as cache hits, computed ones as misses
+def cache_stats():
+    return {name: {'hits': counters['coalesced'], 'misses': counters['computed']}
+            for name, counters in single_flight.shared.merged().items()}
+
+# Bytes of the results currently shared between coalesced calls
+def memory_usage():
+    with single_flight.lock:
+        calls = list(single_flight.calls.values())
+    return {'caches': {'coalesced calls in flight': deep_size(calls)}}
+
+# Wraps a callback so that concurrent calls with identical inputs are computed once.
+# Callbacks must not mutate their inputs or the shared result.
+def coalesced(function):
+    @functools.wraps(function)
+    def wrapper(*args):
+        key = json.dumps(args, sort_keys=True, default=str)
+        return single_flight.do(function.__name__, key, function, *args)
+    return wrapper
+
+# Serves the counters of all workers as JSON: per callback, the computations done and the calls that shared one
+def init_coalescing(server, path='/coalescing'):
+    @server.route(path)
+    @admin_only
+    def coalescing_stats():
+        return jsonify(single_flight.shared.merged())
@@ -0,0 +1,76 @@
+import gzip
+import logging
+import os
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Responses smaller than this are sent as they are; compressing them costs more than it saves
+COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 500))
+# gzip uses 1-9, brotli 0-11; the level is clamped to the range of the chosen encoding
+COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', 6))
+# Log raw and compressed size of every callback and layout response
+COMPRESS_MEASURE = os.environ.get('COMPRESS_MEASURE') == '1'
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/html', 'text/css', 'text/javascript', 'application/javascript'}
+
+logger = logging.getLogger(__name__)
+
+def choose_encoding(accept_encoding):
+    accepted = {part.split(';')[0].strip() for part in accept_encoding.lower().split(',')}
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+def compress(data, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(data, quality=min(max(level, 0), 11))
+    return gzip.compress(data, compresslevel=min(max(level, 1), 9))
+
+# Name of the Dash response for the measurement log: the callback outputs or the layout
+def response_name():
+    if request.path.endswith('/_dash-update-component'):
+        body = request.get_json(silent=True) or {}
+        return body.get('output', 'callback')
+    if request.path.endswith('/_dash-layout'):
+        return 'layout'
+    return None
+
+# Compresses the responses of the Flask server behind a Dash app
+def init_compression(server, min_size=COMPRESS_MIN_SIZE, level=COMPRESS_LEVEL, measure=COMPRESS_MEASURE):
+    if measure:
+        logger.setLevel(logging.INFO)
+        if not logger.handlers:
+            logger.addHandler(logging.StreamHandler())
+
+    @server.after_request
+    def compress_response(response):
+        if (response.direct_passthrough
+                or response.status_code != 200
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = choose_encoding(request.headers.get('Accept-Encoding', ''))
+        data = response.get_data()
+        name = response_name() if measure else None
+
+        if encoding is None or len(data) < min_size:
+            if name:
+                logger.info('%s: %d bytes, not compressed', name, len(data))
+            return response
+
+        compressed = compress(data, encoding, level)
+        if name:
+            logger.info('%s: %d bytes raw, %d bytes %s (%.1f%%)',
+                        name, len(data), len(compressed), encoding, 100 * len(compressed) / len(data))
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,579 @@
+import os
+
+# Imported first so the startup profile covers the imports below
+import startup_profile
+
+import dash
+from dash import dcc, html, dash_table
+from dash.dependencies import Input, Output, State, ClientsideFunction
+
+from aggregations import RUN_FILES
+from background import create_background_manager, files_version
+from backends import create_aggregations
+from coalesce import cache_stats, coalesced, init_coalescing
+from coalesce import memory_usage as coalescing_memory_usage
+from compression import init_compression
+from memory_report import deep_size, init_memory_report
+from metrics import init_metrics
+from parallel import map_parallel
+from patches import patch_figures
+from search_index import PrefixIndex
+from themes import THEMES, POWER_AXIS, ENERGY_AXIS, SOC_AXIS, EV_COUNT_AXIS, make_figure, make_trace
+from tracing import init_tracing, span, traced
+from tracing import memory_usage as tracing_memory_usage
+from trace_cache import cache_stats as trace_cache_stats
+from trace_cache import memory_usage as trace_cache_memory_usage
+from trace_cache import trace_cache
+
+startup_profile.mark('imports')
+
+GRID_LIMIT = 150
+# Theme of new sessions; every session can switch it
+DEFAULT_THEME = os.environ.get('DASH_THEME', 'dark')
+# Ship per-vehicle and per-station series to the browser once and filter there instead of on the server
+CLIENTSIDE_FILTERING = os.environ.get('CLIENTSIDE_FILTERING') == '1'
+
+# Query backend picked by AGGREGATION_BACKEND, see backends.py
+aggregations = create_aggregations(run_files=RUN_FILES)
+RUN_NAMES = {'df1': 'Run 1', 'df2': 'Run 2'}
+vehicle_index = PrefixIndex(aggregations.vehicles())
+station_index = PrefixIndex(aggregations.stations())
+startup_profile.mark('indexes')
+
+app = dash.Dash(__name__)
+app.config.suppress_callback_exceptions = True
+init_compression(app.server)
+init_coalescing(app.server)
+init_metrics(app, cache_sources=[cache_stats], trace_sources=[trace_cache_stats])
+init_tracing(app)
+# Results of background jobs are cached by the inputs and the run files they were aggregated from
+runs_version = files_version(RUN_FILES.values())
+background_manager = create_background_manager(cache_by=[lambda: runs_version])
+startup_profile.mark('app')
+
+# Page layouts in one theme
+def build_page_layouts(theme):
+    hr_style = THEMES[theme]['hr_style']
+
+    # Progress and cancel controls shown while the infrastructure graphs are computed in the background
+    infrastructure_job_controls = []
+    if background_manager is not None:
+        infrastructure_job_controls = [
+            html.Div(id='infrastructure-job', children=[
+                html.Hr(style=hr_style),
+                html.Progress(id='infrastructure-progress', value='0', max='1', style={'width': '100%'}),
+                html.Button('Cancel', id='cancel-infrastructure'),
+            ], style={'display': 'none'}),
+        ]
+
+    # Dashboard Page Content Layout
+    dashboard_layout = html.Div(
+        children=[
+        html.H1("Dashboard"),
+        html.Div(id='kpis', className='div-table'),
+    ])
+
+    # Charging Infrastructure Page Content Layout
+    charging_infrastructure_layout = html.Div(
+        children=[
+        html.H1("Charging Infrastructure"),
+        html.Div(children=[
+            html.Div(children=[
+                html.H3('Selected Dataset'),
+                dcc.Checklist(
+                    id='data-toggle-infrastructure',
+                    options=[
+                        {'label': 'Dataset 1', 'value': 'df1'},
+                        {'label': 'Dataset 2', 'value': 'df2'}
+                    ],
+                    value=['df1', 'df2'],
+                    labelStyle={'display': 'block', 'margin-bottom': '10px', 'font-size': '18px'}
+                ),
+                html.Hr(style=hr_style),
+                html.H3('Dataset View'),
+                dcc.RadioItems(
+                    id='view-toggle-infrastructure',
+                    options=[
+                        {'label': 'Combined', 'value': 'combined'},
+                        {'label': 'Separate', 'value': 'separate'}
+                    ],
+                    value='combined',
+                    labelStyle={'display': 'block', 'margin-bottom': '10px', 'font-size': '18px'}
+                ),
+                html.Hr(style=hr_style),
+                html.H3('Graph Options'),
+                dcc.Checklist(
+                    id='graph-toggle-infrastructure',
+                    options=[
+                        {'label': 'Total Energy Used', 'value': 'total_energy'},
+                        {'label': 'CP Target Power', 'value': 'target_power'},
+                        {'label': 'CP Charging Rate', 'value': 'charging_rate'},
+                        {'label': 'Grid Limit', 'value': 'grid_limit'},
+                        {'label': 'Cars Currently Charging', 'value': 'cars_charging'}
+                    ],
+                    value=['total_energy', 'target_power', 'charging_rate', 'grid_limit', 'cars_charging'],
+                    labelStyle={'display': 'block', 'margin-bottom': '10px'}
+                )] + infrastructure_job_controls, className='div-user-controls'),
+            html.Div(id='infrastructure-graph-container', className='div-for-charts'),
+            dcc.Store(id='infrastructure-figures'),
+            dcc.Store(id='infrastructure-graph-state'),
+        ], style={'display': 'flex'})])
+
+    # Cars Page Content Layout
+    cars_layout = html.Div(
+        children=[
+        html.H1("Cars"),
+        html.Div(children=[
+                html.Div(children=[
+                    html.H3('Selected Vehicle'),
+                    dcc.Dropdown(
+                        id='car-dropdown',
+                        options=vehicle_index.options(''),
+                        value=vehicle_index.first(),
+                        placeholder='Search vehicle',
+                        className='station-dropdown'
+                    ),
+                    html.Hr(style=hr_style),
+                    html.H3('Dataset View'),
+                    dcc.RadioItems(
+                        id='view-toggle-cars',
+                        options=[
+                            {'label': 'Combined', 'value': 'combined'},
+                            {'label': 'Separate', 'value': 'separate'}
+                        ],
+                        value='combined',
+                        labelStyle={'display': 'block', 'margin-bottom': '10px', 'font-size': '18px'}
+                    ),
+                    html.Hr(style=hr_style),
+                    html.H3('Graph Options'),
+                    dcc.Checklist(
+                        id='graph-toggle-cars',
+                        options=[
+                            {'label': 'Total Energy Used', 'value': 'total_energy'},
+                            {'label': 'State of Charge', 'value': 'soc'},
+                            {'label': 'CP Target Power', 'value': 'target_power'},
+                            {'label': 'CP Charging Rate', 'value': 'charging_rate'}
+                        ],
+                        value=['total_energy','soc','target_power','charging_rate'],
+                        labelStyle={'display': 'block', 'margin-bottom': '10px'}
+                    )], className='div-user-controls'),
+                html.Div(id='car-graph-container', className='div-for-charts'),
+                dcc.Store(id='car-figures')], style={'display': 'flex'})
+        ])
+
+    # Charging Station Page Content Layout
+    charging_station_layout = html.Div(children=[
+        html.H1("Charging Station"),
+        html.Div(children=[
+            html.Div(children=[
+                html.H3('Selected Charging Station'),
+                dcc.Dropdown(
+                    id='station-dropdown',
+                    options=station_index.options(''),
+                    value=station_index.first(),
+                    placeholder='Search charging station',
+                    className='station-dropdown'
+                ),
+                html.Hr(style=hr_style),
+                html.H3('Dataset View'),
+                dcc.RadioItems(
+                    id='view-toggle-stations',
+                    options=[
+                        {'label': 'Combined', 'value': 'combined'},
+                        {'label': 'Separate', 'value': 'separate'}
+                    ],
+                    value='combined',
+                    labelStyle={'display': 'block', 'margin-bottom': '10px', 'font-size': '18px'}
+                ),
+                html.Hr(style=hr_style),
+                html.H3('Graph Options'),
+                dcc.Checklist(
+                    id='graph-toggle-stations',
+                    options=[
+                        {'label': 'Target Power over the Day', 'value': 'target_power'},
+                        {'label': 'Charging Rate over the Day', 'value': 'charging_rate'}
+                    ],
+                    value=['target_power','charging_rate'],
+                    labelStyle={'display': 'block', 'margin-bottom': '10px'}
+                )], className='div-user-controls'),
+            html.Div(id='station-graph-container', className='div-for-charts'),
+            dcc.Store(id='station-figures')], style={'display': 'flex'})
+    ])
+
+    return {
+        '/Dash': html.Div([dashboard_layout], style={'width': '100%'}),
+        '/charging-infrastructure': html.Div([charging_infrastructure_layout], style={'width': '100%'}),
+        '/cars': html.Div([cars_layout], style={'width': '100%'}),
+        '/charging-station': html.Div([charging_station_layout], style={'width': '100%'}),
+    }
+
+# Prebuilt page layouts of every theme, shipped once so the browser switches pages and themes
+# without a server round-trip
+page_layouts = {theme: build_page_layouts(theme) for theme in THEMES}
+
+startup_profile.mark('layouts')
+
+# Series and figure settings for the clientside Cars and Charging Station callbacks
+client_stores = []
+if CLIENTSIDE_FILTERING:
+    client_stores = [
+        dcc.Store(id='figure-context', data={
+            'runs': RUN_NAMES,
+            'axes': {'power': POWER_AXIS, 'soc': SOC_AXIS, 'energy': ENERGY_AXIS},
+        }),
+        dcc.Store(id='vehicle-series', data=aggregations.vehicle_store()),
+        dcc.Store(id='station-series', data=aggregations.station_store()),
+    ]
+
+# Theme of this session, kept by the browser for the session
+theme_toggle = dcc.RadioItems(
+    id='theme-toggle',
+    options=[{'label': theme.capitalize(), 'value': theme} for theme in THEMES],
+    value=DEFAULT_THEME,
+    inline=True,
+    persistence=True,
+    persistence_type='session',
+    className='theme-toggle'
+)
+
+# Navigation Bar Layout
+app.layout = html.Div(id='theme-root', className=f'theme-{DEFAULT_THEME}', children=[
+    html.Div([
+        dcc.Link('Dashboard', href='/Dash', className='nav-link', id='link-dash'),
+        dcc.Link('Charging Infrastructure', href='/charging-infrastructure', className='nav-link', id='link-charging'),
+        dcc.Link('Cars', href='/cars', className='nav-link', id='link-cars'),
+        dcc.Link('Charging Station', href='/charging-station', className='nav-link', id='link-station'),
+        theme_toggle,
+    ], className='div-header-bar'),
+    dcc.Location(id='url', refresh=False),
+    dcc.Store(id='page-layouts', data=page_layouts),
+    dcc.Store(id='figure-templates', data={theme: THEMES[theme]['template'] for theme in THEMES}),
+    html.Div(id='page-content', style={'display': 'flex'})
+] + client_stores)
+startup_profile.mark('client stores')
+
+# Makes theme the one new sessions start with, for launchers of one theme
+def set_default_theme(theme):
+    theme_toggle.value = theme
+    app.layout.className = f'theme-{theme}'
+
+# Sizes of the search indexes, layouts and disk cache of this worker for the memory report
+def memory_usage():
+    usage = {
+        'indexes': {'vehicle search': deep_size(vehicle_index), 'station search': deep_size(station_index)},
+        'layouts': {'page layouts': deep_size(page_layouts), 'client stores': deep_size(client_stores)},
+    }
+    if background_manager is not None:
+        usage['disk'] = {'background jobs': background_manager.handle.volume()}
+    return usage
+
+init_memory_report(app.server, [aggregations.memory_usage, memory_usage, coalescing_memory_usage, tracing_memory_usage,
+                                trace_cache_memory_usage],
+                   outside=('aggregation service', 'disk'))
+
+# Clientside callback for Page Content Update
+app.clientside_callback(
+    ClientsideFunction(namespace='navigation', function_name='display_page'),
+    Output('page-content', 'children'),
+    [Input('url', 'pathname'),
+     Input('theme-toggle', 'value')],
+    [State('page-layouts', 'data')]
+)
+
+app.clientside_callback(
+    ClientsideFunction(namespace='navigation', function_name='theme_class'),
+    Output('theme-root', 'className'),
+    [Input('theme-toggle', 'value')]
+)
+
+# Clientside callback for Active Button
+app.clientside_callback(
+    ClientsideFunction(namespace='navigation', function_name='active_link'),
+    [Output('link-dash', 'className'),
+     Output('link-charging', 'className'),
+     Output('link-cars', 'className'),
+     Output('link-station', 'className')],
+    [Input('url', 'pathname')]
+)
+
+#Callbacks serving one page of matching dropdown options for the typed prefix
+@app.callback(Output('car-dropdown', 'options'),
+              [Input('car-dropdown', 'search_value')],
+              [State('car-dropdown', 'value')],
+              prevent_initial_call=True)
+def search_vehicles(search_value, selected_car):
+    return vehicle_index.options(search_value, selected_car)
+
+@app.callback(Output('station-dropdown', 'options'),
+              [Input('station-dropdown', 'search_value')],
+              [State('station-dropdown', 'value')],
+              prevent_initial_call=True)
+def search_stations(search_value, selected_station):
+    return station_index.options(search_value, selected_station)
+
+#Callback to calculate KPIs of dataframes when navigating to page
+@app.callback(Output('kpis', 'children'),
+              [Input('url', 'pathname'),
+               Input('theme-toggle', 'value')])
+@traced
+def update_kpis(pathname, theme):
+    total_energy_1, cars_charged_1, cars_not_charged_1, avg_soc_ac_1, median_soc_1, avg_soc_bc_1 = aggregations.kpis('df1')
+    total_energy_2, cars_charged_2, cars_not_charged_2, avg_soc_ac_2, median_soc_2, avg_soc_bc_2 = aggregations.kpis('df2')
+
+    return dash_table.DataTable(
+    data = [
+        {'KPI': 'Total Energy Used (kWh)', 'Dataset 1': round(total_energy_1,2), 'Dataset 2': round(total_energy_2,2)},
+        {'KPI': 'Cars Charged', 'Dataset 1': cars_charged_1, 'Dataset 2': cars_charged_2},
+        {'KPI': 'Cars Not Charged', 'Dataset 1': cars_not_charged_1, 'Dataset 2': cars_not_charged_2},
+        {'KPI': 'Average SoC before Charging', 'Dataset 1': round(avg_soc_bc_1,3), 'Dataset 2': round(avg_soc_bc_2,3)},
+        {'KPI': 'Average SoC after Charging', 'Dataset 1': round(avg_soc_ac_1,4), 'Dataset 2': round(avg_soc_ac_2,4)},
+    ],
+    columns = [
+        {'name': 'KPI', 'id': 'KPI'},
+        {'name': 'Dataset 1', 'id': 'Dataset 1'},
+        {'name': 'Dataset 2', 'id': 'Dataset 2'}
+    ],
+    style_header = THEMES[theme]['style_header'],
+    style_cell = THEMES[theme]['style_cell'],
+    style_data = THEMES[theme]['style_data'],
+    style_table = {
+        'borderRadius': '5px',
+        'overflow': 'hidden',
+        'margin': 'auto',
+    },
+    style_as_list_view = True,
+    style_data_conditional = THEMES[theme]['style_data_conditional']
+    )
+
+#Creates the trace for one selected option of one dataset
+@traced
+def create_infrastructure_trace(graph, trace):
+    dataset, option = trace
+    name = RUN_NAMES[dataset]
+    if option == 'grid_limit':
+        times = aggregations.times(dataset)
+        return make_trace(x=times, y=[GRID_LIMIT] * len(times), mode='lines',
+                          name='Grid Limit', line={'dash': 'dash'}, meta=dataset)
+    series = aggregations.infrastructure_series(dataset, option)
+    if option == 'target_power':
+        return make_trace(x=series.index, y=series, mode='markers+lines',
+                          name=f'{name} - CP Target Power', line={'shape': 'hv', 'dash': 'solid'}, meta=dataset)
+    if option == 'charging_rate':
+        return make_trace(x=series.index, y=series, mode='markers+lines',
+                          name=f'{name} - CP Charging Rate', line={'shape': 'hv', 'dash': 'solid'}, meta=dataset)
+    if option == 'total_energy':
+        return make_trace(x=series.index, y=series, line={'shape': 'hv'}, mode='lines',
+                          name=f'{name} - Cumulative Total Energy Used', meta=dataset)
+    return make_trace(x=series.index, y=series, line={'shape': 'hv'}, mode='lines',
+                      name=f'{name} - Cars Currently Charging', meta=dataset)
+
+@traced
+def create_infrastructure_figure(graph, traces):
+    title, separate_title, yaxis = {
+        'power': ('Power Consumption', 'Power Consumption in ({})', POWER_AXIS),
+        'total_energy': ('Energy Used', 'Energy Used in {}', ENERGY_AXIS),
+        'cars_charging': ('Number of EVs Charging', 'Number of EVs Charging in {}', EV_COUNT_AXIS),
+    }[graph]
+    datasets = list(dict.fromkeys(dataset for dataset, _ in traces))
+    data = infrastructure_traces(graph, traces)
+    return make_figure(data, title, yaxis,
+                       separate=[(dataset, separate_title.format(RUN_NAMES[dataset])) for dataset in datasets])
+
+#Takes the traces from the trace cache; the ones of runs and options not aggregated yet are aggregated in parallel
+def infrastructure_traces(graph, traces):
+    def compute(missing):
+        return dict(zip(missing, map_parallel(lambda trace: create_infrastructure_trace(graph, trace), missing)))
+    #Background jobs run in processes forked for one job, their cache would be gone with them
+    if background_manager is not None:
+        computed = compute(traces)
+        return [computed[trace] for trace in traces]
+    cached = trace_cache.get_many('update_infrastructure_graph', traces, compute)
+    return [cached[trace] for trace in traces]
+
+def cached_infrastructure_trace(graph, trace):
+    return infrastructure_traces(graph, [trace])[0]
+
+#Lists the combined figures and their traces for the selected options, in display order
+def infrastructure_figure_spec(data_toggle, graph_toggle):
+    power_options = [option for option in ('target_power', 'charging_rate', 'grid_limit') if option in graph_toggle]
+    spec = []
+    if 'target_power' in graph_toggle or 'charging_rate' in graph_toggle:
+        spec.append(('power', [(dataset, option) for dataset in data_toggle for option in power_options]))
+    for option in ('total_energy', 'cars_charging'):
+        if option in graph_toggle:
+            spec.append((option, [(dataset, option) for dataset in data_toggle]))
+    return spec
+
+#Callback to update infrastructure figures when navigated to or user input changed.
+#The Combined/Separate view is arranged in the browser from these figures.
+def update_infrastructure_graph(data_toggle, graph_toggle, rendered, set_progress=None):
+    with span('figure_spec'):
+        spec = infrastructure_figure_spec(data_toggle, graph_toggle)
+    state = {'data': data_toggle, 'graph': graph_toggle}
+
+    #Only the graph options changed: send the added or removed figures and traces instead of every figure
+    if rendered and rendered['data'] == data_toggle:
+        old_spec = infrastructure_figure_spec(data_toggle, rendered['graph'])
+        with span('patch_figures'):
+            return patch_figures(old_spec, spec, create_infrastructure_figure, cached_infrastructure_trace), state
+
+    figures = []
+    for graph, traces in spec:
+        figures.append(create_infrastructure_figure(graph, traces))
+        if set_progress is not None:
+            set_progress((str(len(figures)), str(len(spec))))
+    return figures, state
+
+infrastructure_callback = (
+    [Output('infrastructure-figures', 'data'),
+     Output('infrastructure-graph-state', 'data')],
+    [Input('data-toggle-infrastructure', 'value'),
+     Input('graph-toggle-infrastructure', 'value')],
+    [State('infrastructure-graph-state', 'data')]
+)
+if background_manager is None:
+    app.callback(*infrastructure_callback)(coalesced(traced(update_infrastructure_graph)))
+else:
+    #A new selection terminates the job still running for the previous one, Cancel terminates it outright.
+    #The manager caches the results; the trace cache and coalescing do not apply here, see background.py.
+    @app.callback(
+        *infrastructure_callback,
+        background=True,
+        manager=background_manager,
+        progress=[Output('infrastructure-progress', 'value'),
+                  Output('infrastructure-progress', 'max')],
+        running=[(Output('infrastructure-job', 'style'), {'display': 'block'}, {'display': 'none'})],
+        cancel=[Input('cancel-infrastructure', 'n_clicks')]
+    )
+    def update_infrastructure_graph_in_background(set_progress, data_toggle, graph_toggle, rendered):
+        return update_infrastructure_graph(data_toggle, graph_toggle, rendered, set_progress)
+
+SERIES_NAMES = {
+    'target_power': 'CP Target Power',
+    'charging_rate': 'CP Charging Rate',
+    'soc': 'State of Charge',
+    'total_energy': 'Cumulative Total Energy Used',
+}
+POWER_OPTIONS = ('target_power', 'charging_rate')
+
+#Creates the step trace of one series of one run
+def create_series_trace(x, y, dataset, option):
+    line = {'dash': 'solid', 'shape': 'hv'} if option in POWER_OPTIONS else {'shape': 'hv'}
+    return make_trace(x=x, y=y, mode='lines', name=f'{RUN_NAMES[dataset]} - {SERIES_NAMES[option]}',
+                      line=line, meta=dataset)
+
+#Traces of one vehicle or station, taken from the trace cache. query(dataset, key, options) aggregates
+#the missing options of one run at once; the runs are aggregated in parallel.
+def series_traces(callback, query, key, spec):
+    def compute(missing):
+        missing_options = {}
+        for _, dataset, option in missing:
+            missing_options.setdefault(dataset, []).append(option)
+
+        @traced
+        def create_run_traces(dataset):
+            options = missing_options[dataset]
+            series = query(dataset, key, options)
+            return {(key, dataset, option): create_series_trace(series[option].index, series[option], dataset, option)
+                    for option in options}
+
+        computed = {}
+        for run_traces in map_parallel(create_run_traces, list(missing_options)):
+            computed.update(run_traces)
+        return computed
+
+    # A cleared dropdown selects nothing and the figures stay empty, as in the browser. The queries
+    # must not see None, which would select every vehicle or station.
+    if key is None:
+        return {graph: [create_series_trace([], [], dataset, option) for dataset, option in traces]
+                for graph, traces in spec}
+    keys = [(key, dataset, option) for _, traces in spec for dataset, option in traces]
+    cached = trace_cache.get_many(callback, keys, compute)
+    return {graph: [cached[(key, dataset, option)] for dataset, option in traces] for graph, traces in spec}
+
+#Lists the Cars figures and their (run, option) traces for the selected options, in display order
+def car_figure_spec(graph_toggle):
+    power_options = [option for option in POWER_OPTIONS if option in graph_toggle]
+    spec = []
+    if power_options:
+        spec.append(('power', [(dataset, option) for dataset in RUN_NAMES for option in power_options]))
+    for option in ('soc', 'total_energy'):
+        if option in graph_toggle:
+            spec.append((option, [(dataset, option) for dataset in RUN_NAMES]))
+    return spec
+
+#Callback to update car figures when navigated to or user input changed.
+#Each run's series is aggregated once; other selections and views reuse the cached traces.
+def update_car_graph(selected_car, graph_toggle):
+    with span('figure_spec'):
+        spec = car_figure_spec(graph_toggle)
+    traces = series_traces('update_car_graph', aggregations.vehicle_series, selected_car, spec)
+
+    figures = []
+    for graph, _ in spec:
+        title, yaxis = {
+            'power': (f'Power Consumption EV {selected_car}', POWER_AXIS),
+            'soc': (f'State of Charge EV {selected_car}', SOC_AXIS),
+            'total_energy': (f'Energy Used EV {selected_car}', ENERGY_AXIS),
+        }[graph]
+        separate = [(dataset, f'{title} ({RUN_NAMES[dataset]})') for dataset in RUN_NAMES]
+        figures.append(make_figure(traces[graph], title, yaxis, separate=separate))
+    return figures
+
+#Callback to update station figures when navigated to or user input changed
+def update_station_graph(selected_station, graph_toggle):
+    power_options = [option for option in POWER_OPTIONS if option in graph_toggle]
+    spec = [('power', [(dataset, option) for dataset in RUN_NAMES for option in power_options])]
+    traces = series_traces('update_station_graph', aggregations.station_series, selected_station, spec)
+
+    title = f'Power Usage of Charging Station {selected_station}'
+    separate = [(dataset, f'{title} ({RUN_NAMES[dataset]})') for dataset in RUN_NAMES]
+    return [make_figure(traces['power'], title, POWER_AXIS, separate=separate)]
+
+#Cars and Charging Station figures are built in the browser from the shipped series, or on the server
+if CLIENTSIDE_FILTERING:
+    app.clientside_callback(
+        ClientsideFunction(namespace='series', function_name='cars'),
+        Output('car-figures', 'data'),
+        [Input('car-dropdown', 'value'),
+         Input('graph-toggle-cars', 'value')],
+        [State('vehicle-series', 'data'),
+         State('figure-context', 'data')]
+    )
+    app.clientside_callback(
+        ClientsideFunction(namespace='series', function_name='stations'),
+        Output('station-figures', 'data'),
+        [Input('station-dropdown', 'value'),
+         Input('graph-toggle-stations', 'value')],
+        [State('station-series', 'data'),
+         State('figure-context', 'data')]
+    )
+else:
+    app.callback(
+        Output('car-figures', 'data'),
+        [Input('car-dropdown', 'value'),
+         Input('graph-toggle-cars', 'value')]
+    )(coalesced(traced(update_car_graph)))
+    app.callback(
+        Output('station-figures', 'data'),
+        [Input('station-dropdown', 'value'),
+         Input('graph-toggle-stations', 'value')]
+    )(coalesced(traced(update_station_graph)))
+
+#Clientside callbacks arranging the figures into the Combined or Separate view without a server round-trip
+for page, view_toggle in [('infrastructure', 'view-toggle-infrastructure'),
+                          ('car', 'view-toggle-cars'),
+                          ('station', 'view-toggle-stations')]:
+    app.clientside_callback(
+        ClientsideFunction(namespace='views', function_name='arrange'),
+        Output(f'{page}-graph-container', 'children'),
+        [Input(f'{page}-figures', 'data'),
+         Input(view_toggle, 'value'),
+         Input('theme-toggle', 'value')],
+        [State('figure-templates', 'data')]
+    )
+
+startup_profile.finish(app.server)
+
+if __name__ == '__main__':
+    app.run_server(debug=True)
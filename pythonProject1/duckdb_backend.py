@@ -0,0 +1,228 @@
+import hashlib
+import os
+import threading
+
+import pandas as pd
+
+from aggregations import COLUMNS, NUMBERS, Aggregations, time_of_day
+from client_data import build_vehicle_store, build_station_store
+from startup_profile import mark
+from tracing import span
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+# Query backend on the embedded DuckDB engine for runs too large for pandas, e.g.
+#
+#   AGGREGATION_BACKEND=duckdb python dashboard.py
+#
+# Every run CSV is converted once, in DuckDB, to a Parquet file in PARQUET_CACHE_DIR, kept until the CSV
+# changes. Queries run on those files: filters and grouping are pushed down to the engine and only the
+# aggregated series come back. Sums are compensated like the pandas groupby sums, and cumulative sums are
+# taken over the grouped series as in pandas, so the results match the pandas backend.
+PARQUET_CACHE_DIR = os.environ.get('PARQUET_CACHE_DIR', '.parquet-cache')
+
+# preprocess() in SQL: decimal commas, vehicle ids as integers, rows without a vehicle dropped
+CONVERT_SQL = '''
+COPY (
+    SELECT CAST(time AS BIGINT) AS time, type, CAST(cp AS BIGINT) AS cp,
+           CAST(CAST(replace(vehicle, ',', '.') AS DOUBLE) AS BIGINT) AS vehicle,
+           {numbers}
+    FROM read_csv('{source}', delim=';', header=true, all_varchar=true)
+    WHERE vehicle IS NOT NULL
+) TO '{target}' (FORMAT parquet)
+'''
+
+AGGREGATE_SQL = {
+    'sum': 'coalesce(fsum({column}), 0)',
+    'mean': 'fsum({column}) / count({column})',
+    'nunique': 'count(DISTINCT {column})',
+    # Summed per time of day here, accumulated over the day in pandas
+    'cumsum': 'coalesce(fsum({column}), 0)',
+}
+
+# Vehicle counts of calculate_kpis(), the energy increments it sums in row order, and the state of charge of every
+# vehicle at its first row and, for vehicles that stopped charging, at its last row, in row order
+KPI_COUNTS_SQL = '''
+SELECT count(DISTINCT vehicle) FILTER (WHERE vehicle_charge > 0),
+       count(DISTINCT vehicle) FILTER (WHERE vehicle_charge = 0)
+FROM {run}
+'''
+KPI_ENERGY_SQL = 'SELECT cp_charge_increment FROM {run} ORDER BY row'
+KPI_SOC_SQL = '''
+WITH ranked AS (
+    SELECT *, row_number() OVER (PARTITION BY vehicle ORDER BY row DESC) AS from_end,
+              row_number() OVER (PARTITION BY vehicle ORDER BY row) AS from_start
+    FROM {run}
+),
+stopped AS (
+    SELECT vehicle FROM ranked WHERE from_end <= 3 GROUP BY vehicle
+    HAVING count(*) = 3
+       AND bool_and(coalesce(cp_charge_increment = 0 AND cp_charging_rate = 0 AND cp_target_power = 0, false))
+)
+SELECT vehicle_soc, from_start = 1 AS first, from_end = 1 AND vehicle IN (SELECT vehicle FROM stopped) AS stopped
+FROM ranked WHERE from_start = 1 OR from_end = 1 ORDER BY row
+'''
+
+def quote(path):
+    return path.replace("'", "''")
+
+# Path of the Parquet copy of a run CSV, written first if the CSV is new or changed since
+def cached_parquet(path, cache_dir=PARQUET_CACHE_DIR):
+    stat = os.stat(path)
+    version = hashlib.sha256(f'{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}'.encode()).hexdigest()[:16]
+    target = os.path.join(cache_dir, f'{os.path.splitext(os.path.basename(path))[0]}-{version}.parquet')
+    if not os.path.exists(target):
+        os.makedirs(cache_dir, exist_ok=True)
+        partial = f'{target}.{os.getpid()}.tmp'
+        numbers = ',\n           '.join(f"CAST(replace({column}, ',', '.') AS DOUBLE) AS {column}" for column in NUMBERS)
+        with duckdb.connect() as connection:
+            connection.execute(CONVERT_SQL.format(numbers=numbers, source=quote(path), target=quote(partial)))
+        os.replace(partial, target)
+    return target
+
+class DuckDBAggregations(Aggregations):
+    def __init__(self, parquet_files):
+        self.parquet_files = parquet_files
+        self.views = {dataset: f'run_{position}' for position, dataset in enumerate(parquet_files)}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.connection = None
+        self.connection_pid = None
+
+    # Every process opens its own in-memory database with a view per run; connections do not survive a fork
+    def process_connection(self):
+        with self.lock:
+            if self.connection_pid != os.getpid():
+                self.connection = duckdb.connect()
+                for dataset, view in self.views.items():
+                    self.connection.execute(f"CREATE VIEW {view} AS SELECT *, file_row_number AS row "
+                                            f"FROM read_parquet('{quote(self.parquet_files[dataset])}', file_row_number=true)")
+                self.connection_pid = os.getpid()
+            return self.connection
+
+    # Every thread queries through its own cursor
+    def cursor(self):
+        if getattr(self.local, 'pid', None) != os.getpid():
+            self.local.cursor = self.process_connection().cursor()
+            self.local.pid = os.getpid()
+        return self.local.cursor
+
+    def runs(self):
+        return list(self.parquet_files)
+
+    # Ids in the order they first appear in the runs, like pandas unique()
+    def first_appearance(self, column):
+        union = ' UNION ALL '.join(f'SELECT {column} AS id, {position} * 4294967296 + row AS seen FROM {view}'
+                                   for position, view in enumerate(self.views.values()))
+        rows = self.cursor().execute(f'SELECT id FROM ({union}) GROUP BY id ORDER BY min(seen)').fetchall()
+        return [row[0] for row in rows]
+
+    def vehicles(self):
+        return self.first_appearance('vehicle')
+
+    def stations(self):
+        return self.first_appearance('cp')
+
+    def times(self, dataset):
+        rows = self.cursor().execute(f'SELECT time FROM {self.views[dataset]} GROUP BY time ORDER BY min(row)').fetchall()
+        return time_of_day([row[0] for row in rows]).array
+
+    def query(self, dataset, aggregates, vehicle=None, cp=None, window=None, positive=None):
+        conditions, parameters = [], []
+        if vehicle is not None:
+            conditions.append('vehicle = ?')
+            parameters.append(int(vehicle))
+        if cp is not None:
+            conditions.append('cp = ?')
+            parameters.append(int(cp))
+        if window is not None:
+            conditions.append('time >= ? AND time < ?')
+            parameters.extend(window)
+        if positive is not None:
+            if positive not in COLUMNS:
+                raise ValueError(f'unknown column {positive!r}')
+            conditions.append(f'{positive} > 0')
+        selects = []
+        for position, (column, how) in enumerate(aggregates.values()):
+            if column not in COLUMNS or how not in AGGREGATE_SQL:
+                raise ValueError(f'unsupported aggregate {how!r} of {column!r}')
+            selects.append(f'{AGGREGATE_SQL[how].format(column=column)} AS value_{position}')
+        where = f'WHERE {" AND ".join(conditions)}' if conditions else ''
+        sql = f'SELECT time, {", ".join(selects) or "count(*)"} FROM {self.views[dataset]} {where} GROUP BY time ORDER BY time'
+
+        with span('query'):
+            result = self.cursor().execute(sql, parameters).df()
+        series = {}
+        with span('convert'):
+            index = time_of_day(result['time'])
+            for position, (name, (column, how)) in enumerate(aggregates.items()):
+                values = pd.Series(result[f'value_{position}'].to_numpy(), index=index, name=column)
+                if how == 'nunique':
+                    values = values.astype('int64')
+                elif how == 'cumsum':
+                    values = values.cumsum()
+                series[name] = values
+        return series
+
+    # One value per vehicle comes back and is averaged in pandas, in row order, as calculate_kpis() does.
+    # The total energy is summed in pandas as well: its pairwise sum over all rows differs from any sum
+    # DuckDB computes in the last digits.
+    def kpis(self, dataset):
+        cursor = self.cursor()
+        cars_charged, cars_not_charged = cursor.execute(KPI_COUNTS_SQL.format(run=self.views[dataset])).fetchone()
+        total_energy_used = cursor.execute(KPI_ENERGY_SQL.format(run=self.views[dataset])).df()['cp_charge_increment'].sum()
+        soc = cursor.execute(KPI_SOC_SQL.format(run=self.views[dataset])).df()
+        soc_after = soc.loc[soc['stopped'], 'vehicle_soc']
+        return (total_energy_used, cars_charged, cars_not_charged,
+                soc_after.mean(), soc_after.median(), soc.loc[soc['first'], 'vehicle_soc'].mean())
+
+    # The runs as preprocessed frames, only for the series stores shipped to the browser
+    def frames(self):
+        frames = {}
+        for dataset, view in self.views.items():
+            df = self.cursor().execute(f'SELECT {", ".join(COLUMNS)} FROM {view} ORDER BY row').df()
+            df['time_of_day'] = time_of_day(df['time'])
+            frames[dataset] = df
+        return frames
+
+    def vehicle_store(self):
+        return build_vehicle_store(self.frames())
+
+    def station_store(self):
+        return build_station_store(self.frames())
+
+    # The runs stay on disk; only DuckDB's buffers are held in memory
+    def memory_usage(self):
+        buffers = self.cursor().execute('SELECT sum(memory_usage_bytes) FROM duckdb_memory()').fetchone()[0]
+        return {
+            'aggregates': {'duckdb buffers': int(buffers or 0)},
+            'disk': {f'parquet {dataset}': os.path.getsize(path) for dataset, path in self.parquet_files.items()},
+        }
+
+def require_duckdb():
+    if duckdb is None:
+        raise ImportError('AGGREGATION_BACKEND=duckdb needs duckdb: pip install duckdb')
+
+def create_duckdb_aggregations(run_files):
+    require_duckdb()
+    parquet_files = {}
+    for dataset, path in run_files.items():
+        parquet_files[dataset] = cached_parquet(path)
+        mark(f'parquet {dataset}')
+    return DuckDBAggregations(parquet_files)
+
+# A DuckDB backend over runs already preprocessed by pandas, as the benchmark builds them, written to Parquet
+# files in directory
+def duckdb_aggregations_from_pandas(data_map, directory):
+    require_duckdb()
+    parquet_files = {}
+    with duckdb.connect() as connection:
+        for dataset, df in data_map.items():
+            parquet_files[dataset] = os.path.join(directory, f'{dataset}.parquet')
+            connection.register('run', df[COLUMNS])
+            connection.execute(f"COPY run TO '{quote(parquet_files[dataset])}' (FORMAT parquet)")
+            connection.unregister('run')
+    return DuckDBAggregations(parquet_files)
@@ -0,0 +1,83 @@
+import argparse
+import json
+import os
+import re
+import time
+from concurrent.futures import as_completed
+
+import plotly.io
+import plotly.utils
+
+import export_static
+from export_static import CAR_OPTIONS, STATION_OPTIONS, load_design
+from parallel import process_pool
+from themes import THEMES, arrange_figures
+
+try:
+    import kaleido
+except ImportError:
+    kaleido = None
+
+# Renders the Cars and Charging Station charts of every vehicle and charge point to image files
+# with the local kaleido engine, spread over a process pool, e.g.
+#
+#   python export_images.py --format png svg --view separate --theme light --workers 8
+
+def slugify(text):
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+
+# Renders all charts of one vehicle or charge point and returns the number of images written
+def export_charts(out, page, key, view, theme, formats, scale):
+    if page == 'cars':
+        figures = export_static.design.update_car_graph(key, CAR_OPTIONS)
+    else:
+        figures = export_static.design.update_station_graph(key, STATION_OPTIONS)
+    os.makedirs(os.path.join(out, page), exist_ok=True)
+    written = 0
+    for figure in arrange_figures(figures, view, theme):
+        figure = json.loads(json.dumps(figure, cls=plotly.utils.PlotlyJSONEncoder))
+        name = slugify(figure['layout']['title']['text'])
+        for image_format in formats:
+            plotly.io.write_image(figure, os.path.join(out, page, f'{name}.{image_format}'),
+                                  format=image_format, scale=scale, validate=False)
+            written += 1
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the Cars and Charging Station charts as images')
+    parser.add_argument('--design', default='dashboard', help='dashboard module to render with')
+    parser.add_argument('--theme', default='dark', choices=list(THEMES))
+    parser.add_argument('--out', default='images', help='output directory')
+    parser.add_argument('--format', nargs='+', default=['png'], choices=['png', 'svg', 'pdf', 'jpeg', 'webp'])
+    parser.add_argument('--view', default='combined', choices=['combined', 'separate'])
+    parser.add_argument('--scale', type=float, default=1, help='image scale factor')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='parallel render processes')
+    parser.add_argument('--pages', nargs='+', default=['cars', 'charging-station'], choices=['cars', 'charging-station'])
+    args = parser.parse_args()
+
+    if kaleido is None:
+        parser.error('image export needs the kaleido package (pip install kaleido)')
+
+    load_design(args.design)
+    design = export_static.design
+    tasks = []
+    if 'cars' in args.pages:
+        tasks.extend(('cars', vehicle) for vehicle in design.vehicle_index.values)
+    if 'charging-station' in args.pages:
+        tasks.extend(('charging-station', station) for station in design.station_index.values)
+
+    start = time.perf_counter()
+    images = 0
+    with process_pool(args.workers, initializer=load_design, initargs=(args.design,)) as pool:
+        futures = [pool.submit(export_charts, args.out, page, key, args.view, args.theme, args.format, args.scale)
+                   for page, key in tasks]
+        for done, future in enumerate(as_completed(futures), 1):
+            images += future.result()
+            elapsed = time.perf_counter() - start
+            rate = done / elapsed
+            print(f'\r{done}/{len(tasks)} chart sets, {images} images, {images / elapsed:.1f} images/s, '
+                  f'eta {(len(tasks) - done) / rate:.0f}s', end='', flush=True)
+    print(f'\n{images} images in {time.perf_counter() - start:.1f}s written to {args.out}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+import argparse
+import glob
+import hashlib
+import importlib
+import itertools
+import json
+import os
+from concurrent.futures import as_completed
+
+import plotly.offline
+import plotly.utils
+
+from backends import AGGREGATION_BACKEND
+from parallel import process_pool
+from themes import THEMES, arrange_figures
+
+# Renders every page of the dashboard for every combination of runs, vehicles and charging stations
+# into static HTML/JSON bundles that any file server can serve, e.g.
+#
+#   python export_static.py --theme dark --out export --workers 8
+
+VIEWS = ['combined', 'separate']
+INFRASTRUCTURE_OPTIONS = ['total_energy', 'target_power', 'charging_rate', 'grid_limit', 'cars_charging']
+CAR_OPTIONS = ['total_energy', 'soc', 'target_power', 'charging_rate']
+STATION_OPTIONS = ['target_power', 'charging_rate']
+
+PAGE_TEMPLATE = '''<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<script src="{root}plotly.min.js"></script>
+</head>
+<body>
+<p><a href="{root}index.html">All pages</a></p>
+<h1>{title}</h1>
+{body}
+</body>
+</html>
+'''
+
+design = None
+
+def load_design(name):
+    global design
+    design = importlib.import_module(name)
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+# Every bundle is rebuilt when the code rendering it, the query backend, the theme or one of the runs it shows
+# changes. The code is every module next to the dashboard's, as rendering goes through the aggregations, query
+# backends and caches as well; the tests next to them are not.
+def content_hashes(design_name, theme, runs, backend):
+    source_dir = os.path.dirname(os.path.abspath(importlib.import_module(design_name).__file__))
+    code = sorted(path for path in glob.glob(os.path.join(source_dir, '*.py'))
+                  if not os.path.basename(path).startswith('test_'))
+    code_hash = hashlib.sha256((theme + backend + ''.join(file_hash(path) for path in code)).encode()).hexdigest()
+    run_hashes = {run: file_hash(path) for run, path in runs.items()}
+    def dependency_hash(dependencies):
+        joined = code_hash + ''.join(run_hashes[run] for run in dependencies)
+        return hashlib.sha256(joined.encode()).hexdigest()
+    return dependency_hash
+
+# (page, key, view, runs the bundle depends on) for every bundle of the dashboard
+def list_bundles():
+    runs = list(design.RUN_NAMES)
+    bundles = [('dashboard', 'kpis', None, runs)]
+    for size in range(1, len(runs) + 1):
+        for selected in itertools.combinations(runs, size):
+            bundles.extend(('charging-infrastructure', '+'.join(selected), view, list(selected)) for view in VIEWS)
+    for vehicle in design.vehicle_index.values:
+        bundles.extend(('cars', str(vehicle), view, runs) for view in VIEWS)
+    for station in design.station_index.values:
+        bundles.extend(('charging-station', str(station), view, runs) for view in VIEWS)
+    return bundles
+
+def bundle_path(page, key, view):
+    return os.path.join(page, key if view is None else f'{key}-{view}')
+
+def render(page, key, view, theme):
+    if page == 'dashboard':
+        table = design.update_kpis('/Dash', theme)
+        return 'Dashboard', {'columns': table.columns, 'data': table.data}
+    if page == 'charging-infrastructure':
+        figures = design.update_infrastructure_graph(key.split('+'), INFRASTRUCTURE_OPTIONS, None)[0]
+        title = f'Charging Infrastructure ({key})'
+    elif page == 'cars':
+        figures = design.update_car_graph(int(key), CAR_OPTIONS)
+        title = f'Cars: EV {key}'
+    else:
+        figures = design.update_station_graph(int(key), STATION_OPTIONS)
+        title = f'Charging Station {key}'
+    return f'{title} - {view}', arrange_figures(figures, view, theme)
+
+def render_html(title, content, root):
+    if isinstance(content, dict):
+        rows = ''.join('<tr>' + ''.join(f'<td>{row[column["id"]]}</td>' for column in content['columns']) + '</tr>'
+                       for row in content['data'])
+        header = ''.join(f'<th>{column["name"]}</th>' for column in content['columns'])
+        body = f'<table><tr>{header}</tr>{rows}</table>'
+    else:
+        figures = json.dumps(content, cls=plotly.utils.PlotlyJSONEncoder)
+        divs = ''.join(f'<div id="graph-{index}"></div>' for index in range(len(content)))
+        body = (f'{divs}\n<script>\nvar figures = {figures};\n'
+                'figures.forEach(function(figure, index) { Plotly.newPlot("graph-" + index, figure.data, figure.layout); });\n'
+                '</script>')
+    return PAGE_TEMPLATE.format(title=title, root=root, body=body)
+
+def export_bundle(out, page, key, view, theme):
+    path = bundle_path(page, key, view)
+    title, content = render(page, key, view, theme)
+    os.makedirs(os.path.join(out, page), exist_ok=True)
+    with open(os.path.join(out, path + '.json'), 'w') as file:
+        json.dump(content, file, cls=plotly.utils.PlotlyJSONEncoder)
+    with open(os.path.join(out, path + '.html'), 'w') as file:
+        file.write(render_html(title, content, '../'))
+    return path, title
+
+def write_index(out, titles):
+    links = ''.join(f'<li><a href="{path}.html">{title}</a></li>' for path, title in sorted(titles.items()))
+    with open(os.path.join(out, 'index.html'), 'w') as file:
+        file.write(PAGE_TEMPLATE.format(title='Dashboard export', root='', body=f'<ul>{links}</ul>'))
+
+def main():
+    parser = argparse.ArgumentParser(description='Export every dashboard page as static HTML/JSON bundles')
+    parser.add_argument('--design', default='dashboard', help='dashboard module to render with')
+    parser.add_argument('--theme', default='dark', choices=list(THEMES))
+    parser.add_argument('--out', default='export', help='output directory')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='parallel render processes')
+    parser.add_argument('--force', action='store_true', help='re-render bundles whose inputs did not change')
+    args = parser.parse_args()
+
+    load_design(args.design)
+    os.makedirs(args.out, exist_ok=True)
+    manifest_path = os.path.join(args.out, 'manifest.json')
+    manifest = {}
+    if os.path.exists(manifest_path) and not args.force:
+        with open(manifest_path) as file:
+            manifest = json.load(file)
+
+    plotly_js = os.path.join(args.out, 'plotly.min.js')
+    if not os.path.exists(plotly_js):
+        with open(plotly_js, 'w') as file:
+            file.write(plotly.offline.get_plotlyjs())
+
+    dependency_hash = content_hashes(args.design, args.theme, design.RUN_FILES, AGGREGATION_BACKEND)
+    bundles = list_bundles()
+    current = {bundle_path(page, key, view) for page, key, view, _ in bundles}
+    manifest = {path: entry for path, entry in manifest.items() if path in current}
+    todo = []
+    for page, key, view, runs in bundles:
+        path = bundle_path(page, key, view)
+        digest = dependency_hash(runs)
+        entry = manifest.get(path)
+        if entry and entry['hash'] == digest and os.path.exists(os.path.join(args.out, path + '.html')):
+            continue
+        todo.append((page, key, view, digest))
+    print(f'{len(bundles)} bundles, {len(bundles) - len(todo)} unchanged, rendering {len(todo)}')
+
+    with process_pool(args.workers, initializer=load_design, initargs=(args.design,)) as pool:
+        futures = {pool.submit(export_bundle, args.out, page, key, view, args.theme): digest for page, key, view, digest in todo}
+        for done, future in enumerate(as_completed(futures), 1):
+            path, title = future.result()
+            manifest[path] = {'hash': futures[future], 'title': title}
+            if done % 50 == 0 or done == len(todo):
+                print(f'{done}/{len(todo)} rendered')
+
+    with open(manifest_path, 'w') as file:
+        json.dump(manifest, file, indent=1, sort_keys=True)
+    write_index(args.out, {path: entry['title'] for path, entry in manifest.items()})
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+import argparse
+import heapq
+import itertools
+import random
+import sys
+import time
+
+# Writes synthetic simulation output in the format of result1.csv, streamed to disk, e.g.
+#
+#   python generate_results.py --out result_large.csv --vehicles 5000 --cps 500 --days 30
+#   python generate_results.py --out result_1e8.csv --vehicles 20000 --cps 2000 --rows 100000000
+#
+# Like the simulation, every event (A arrival, U periodic update, D departure) writes one row per occupied
+# charge point, after sharing the grid limit equally between the vehicles that still charge.
+# cp_charge_increment is the energy a vehicle charged since its previous row; it is empty for the
+# vehicle that just arrived. A departure writes an empty row for the charge point it frees.
+# Vehicles arriving while all charge points are taken wait for the next free one.
+
+HEADER = 'time;type;cp;cp_target_power;cp_charging_rate;vehicle;vehicle_soc;vehicle_charge;vehicle_capacity;cp_charge_increment\n'
+CAPACITIES = [32.3, 37.3, 37.9, 52.0, 64.0, 75.0]
+# Same-time events: departures free charge points before arrivals take them, updates come last
+EVENT_ORDER = {'D': 0, 'A': 1, 'U': 2}
+
+def number(value):
+    return repr(float(value)).replace('.', ',')
+
+class Session:
+    def __init__(self, vehicle, capacity, charge):
+        self.vehicle = number(vehicle)
+        self.capacity = capacity
+        self.capacity_text = number(capacity)
+        self.charge = charge
+        self.rate = 0.0
+        self.increment = None
+
+# Event heap of one day: every vehicle arrives once between 6:00 and 22:00 and stays about an hour
+def day_events(day, args, rng):
+    start = day * 86400
+    events = []
+    for vehicle in range(1, args.vehicles + 1):
+        arrival = start + rng.randint(6 * 3600, 22 * 3600)
+        departure = arrival + int(min(max(rng.gauss(3600, 2100), 300), 9000))
+        capacity = rng.choice(CAPACITIES)
+        charge = capacity * round(rng.uniform(0.3, 0.9), 2)
+        events.append((arrival, EVENT_ORDER['A'], vehicle, 'A', (capacity, charge, departure)))
+        events.append((departure, EVENT_ORDER['D'], vehicle, 'D', None))
+    first = min(event[0] for event in events)
+    last = max(event[0] for event in events)
+    for update in range((first // args.interval + 1) * args.interval, last, args.interval):
+        events.append((update, EVENT_ORDER['U'], 0, 'U', None))
+    heapq.heapify(events)
+    return events
+
+# Yields the rows of all events, day after day. Events at the same time share one snapshot.
+def simulate(args, rng):
+    days = range(args.days) if args.days else itertools.count()
+    for day in days:
+        events = day_events(day, args, rng)
+        plugged = {}
+        vehicle_cps = {}
+        free = list(range(args.cps))
+        waiting = {}
+        last_time = None
+        while events:
+            event_time = events[0][0]
+            batch = []
+            while events and events[0][0] == event_time:
+                batch.append(heapq.heappop(events))
+
+            # Energy charged since the previous event at the rates set then
+            if last_time is not None:
+                for session in plugged.values():
+                    gained = min(session.rate * (event_time - last_time) / 3600, session.capacity - session.charge)
+                    session.charge += gained
+                    if session.increment is not None:
+                        session.increment += gained
+            last_time = event_time
+
+            arrived, departed, updated = set(), set(), False
+            for _, _, vehicle, kind, visit in batch:
+                if kind == 'D':
+                    if vehicle in waiting:
+                        del waiting[vehicle]
+                        continue
+                    cp = vehicle_cps.pop(vehicle)
+                    del plugged[cp]
+                    free.append(cp)
+                    departed.add(cp)
+                elif kind == 'A':
+                    waiting[vehicle] = visit
+                else:
+                    updated = True
+            # Waiting vehicles take free charge points in the order they arrived
+            while free and waiting:
+                vehicle = next(iter(waiting))
+                capacity, charge, _ = waiting.pop(vehicle)
+                cp = free.pop(rng.randrange(len(free)))
+                plugged[cp] = Session(vehicle, capacity, charge)
+                vehicle_cps[vehicle] = cp
+                arrived.add(cp)
+            departed -= arrived
+            if not (arrived or departed or (updated and plugged)):
+                continue
+            kind = 'D' if departed else 'A' if arrived else 'U'
+
+            charging = sum(1 for session in plugged.values() if session.capacity - session.charge > 1e-9)
+            power = min(args.cp_power, args.grid_limit / charging) if charging else 0.0
+            for session in plugged.values():
+                session.rate = power if session.capacity - session.charge > 1e-9 else 0.0
+
+            power_text = number(power)
+            for cp in sorted(list(plugged) + list(departed)):
+                if cp in departed:
+                    yield f'{event_time};{kind};{cp};0,0;0,0;;;;;0,0\n'
+                    continue
+                session = plugged[cp]
+                rate = power_text if session.rate else '0,0'
+                increment = '' if session.increment is None else number(session.increment)
+                yield (f'{event_time};{kind};{cp};{rate};{rate};{session.vehicle};'
+                       f'{number(session.charge / session.capacity)};{number(session.charge)};'
+                       f'{session.capacity_text};{increment}\n')
+                session.increment = 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate simulation output in the result CSV format')
+    parser.add_argument('--out', required=True, help='CSV file to write')
+    parser.add_argument('--vehicles', type=int, default=100)
+    parser.add_argument('--cps', type=int, default=10, help='number of charge points')
+    parser.add_argument('--days', type=int, help='simulated days (default 1, unlimited with --rows)')
+    parser.add_argument('--rows', type=int, help='stop after this many rows')
+    parser.add_argument('--interval', type=int, default=300, help='seconds between update events')
+    parser.add_argument('--cp-power', type=float, default=22.0, help='maximum power of a charge point in kW')
+    parser.add_argument('--grid-limit', type=float, default=120.0, help='power shared by all charge points in kW')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    if args.days is None and args.rows is None:
+        args.days = 1
+
+    rng = random.Random(args.seed)
+    rows = simulate(args, rng)
+    if args.rows is not None:
+        rows = itertools.islice(rows, args.rows)
+
+    start = time.perf_counter()
+    written = 0
+    with open(args.out, 'w', buffering=1 << 20) as file:
+        file.write(HEADER)
+        while True:
+            chunk = list(itertools.islice(rows, 100000))
+            if not chunk:
+                break
+            file.writelines(chunk)
+            written += len(chunk)
+            if written % 1000000 < len(chunk):
+                rate = written / (time.perf_counter() - start)
+                print(f'\r{written} rows, {rate:.0f} rows/s', end='', file=sys.stderr, flush=True)
+    print(f'\n{written} rows written to {args.out} in {time.perf_counter() - start:.1f}s', file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,25 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+# gunicorn settings for wsgi.py; every value can be overridden from the environment
+chdir = os.path.dirname(os.path.abspath(__file__))
+# Local only by default; put a reverse proxy in front or set DASH_BIND=0.0.0.0:8050 to serve other hosts
+bind = os.environ.get('DASH_BIND', '127.0.0.1:8050')
+workers = int(os.environ.get('DASH_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.environ.get('DASH_THREADS', 4))
+worker_class = 'gthread'
+timeout = int(os.environ.get('DASH_TIMEOUT', 120))
+
+# Load the data once in the master and fork the workers from it. Not with the polars backend, which cannot be
+# forked once loaded (see polars_backend.py): every worker loads the runs itself.
+preload_app = os.environ.get('AGGREGATION_BACKEND') != 'polars'
+
+# Directory the workers share their metrics and counters through, see shared_state.py; a fresh one for every
+# server run unless DASH_SHARED_DIR names one
+if not os.environ.get('DASH_SHARED_DIR'):
+    os.environ['DASH_SHARED_DIR'] = tempfile.mkdtemp(prefix='dash-shared-')
+
+    def on_exit(server):
+        shutil.rmtree(os.environ['DASH_SHARED_DIR'], ignore_errors=True)
@@ -0,0 +1,281 @@
+import argparse
+import gc
+import importlib
+import json
+import random
+import threading
+import time
+
+from memory_report import rss_bytes
+
+# In-process load test of the Dash callback endpoint through the Flask test client, no network needed, e.g.
+#
+#   python loadtest.py --users 50 --duration 60
+#   python loadtest.py --users 20 --replay session.har
+#
+# Simulated users click through the pages at random: navigation, run and graph checklists, vehicle and
+# charge point dropdowns including typed searches, each on the page that shows it. As in the browser, a
+# changed property calls the server-side callbacks depending on it whose inputs and outputs are on the shown
+# page, and navigating mounts the new page from its layout and makes the initial calls of its callbacks.
+# --replay sends recorded callback requests instead, from a browser HAR export or a file with one Dash
+# request body per line.
+# Run without BACKGROUND_CALLBACKS; the harness does not poll background jobs.
+
+INFRASTRUCTURE_RUNS = ['df1', 'df2']
+INFRASTRUCTURE_OPTIONS = ['total_energy', 'target_power', 'charging_rate', 'grid_limit', 'cars_charging']
+CAR_OPTIONS = ['total_energy', 'soc', 'target_power', 'charging_rate']
+STATION_OPTIONS = ['target_power', 'charging_rate']
+PAGES = ['/Dash', '/charging-infrastructure', '/cars', '/charging-station']
+THEMES = ['dark', 'light']
+
+def parse_outputs(output):
+    if output.startswith('..'):
+        parts = output[2:-2].split('...')
+    else:
+        parts = [output]
+    outputs = [dict(zip(('id', 'property'), part.rsplit('.', 1))) for part in parts]
+    return outputs if len(outputs) > 1 else outputs[0]
+
+def subset(rng, options):
+    return [option for option in options if rng.random() < 0.6] or [rng.choice(options)]
+
+# Weights of the interactions; each is offered only on the page whose controls it uses
+ACTION_WEIGHTS = {'navigate': 15, 'runs': 10, 'graphs': 20, 'car': 20, 'car_search': 5, 'car_graphs': 5,
+                  'station': 15, 'station_search': 5, 'station_graphs': 10}
+PAGE_ACTIONS = {
+    '/Dash': [],
+    '/charging-infrastructure': ['runs', 'graphs'],
+    '/cars': ['car', 'car_search', 'car_graphs'],
+    '/charging-station': ['station', 'station_search', 'station_graphs'],
+}
+
+# {id: component} of every component with an id in a layout, the layout included
+def components_by_id(layout):
+    return {component.id: component for component in [layout, *layout._traverse()] if getattr(component, 'id', None)}
+
+def output_ids(output):
+    outputs = parse_outputs(output)
+    return [item['id'] for item in (outputs if isinstance(outputs, list) else [outputs])]
+
+# One simulated analyst with their own test client and page state
+class User:
+    def __init__(self, app, dependencies, design, rng, record):
+        self.client = app.server.test_client()
+        self.dependencies = dependencies
+        self.rng = rng
+        self.record = record
+        self.vehicles = design.vehicle_index.values
+        self.stations = design.station_index.values
+        self.root = components_by_id(app.layout)
+        self.pages = {page: components_by_id(layout) for page, layout in design.page_layouts[design.DEFAULT_THEME].items()}
+        self.page = None
+        self.shown = {}
+        self.values = {'theme-toggle.value': rng.choice(THEMES)}
+        self.navigate('/Dash')
+
+    def post(self, output, payload):
+        start = time.perf_counter()
+        response = self.client.post('/_dash-update-component', json=payload)
+        self.record(output, time.perf_counter() - start, response.status_code, len(response.get_data()))
+        return response
+
+    # The current value of a prop: as last set, or as the layout of the shown page defines it
+    def prop(self, key):
+        component, prop = key.rsplit('.', 1)
+        if key in self.values:
+            value = self.values[key]
+        else:
+            value = getattr(self.shown.get(component), prop, None)
+        return {'id': component, 'property': prop, 'value': value}
+
+    def inputs(self, dependency):
+        return [f'{item["id"]}.{item["property"]}' for item in dependency['inputs']]
+
+    # The browser calls a callback only while all its inputs and outputs are on the page
+    def callable(self, output, dependency):
+        ids = [key.rsplit('.', 1)[0] for key in self.inputs(dependency)] + output_ids(output)
+        return all(component in self.shown for component in ids)
+
+    def call(self, output, dependency, changed):
+        payload = {
+            'output': output,
+            'outputs': parse_outputs(output),
+            'inputs': [self.prop(name) for name in self.inputs(dependency)],
+            'state': [self.prop(f'{item["id"]}.{item["property"]}') for item in dependency.get('state', [])],
+            'changedPropIds': changed,
+        }
+        response = self.post(output, payload)
+        if response.status_code == 200:
+            for component, props in response.get_json().get('response', {}).items():
+                if component in self.shown:
+                    for prop, new_value in props.items():
+                        self.values[f'{component}.{prop}'] = new_value
+
+    # Shows a page as the browser does: its components start from the layout's values, dropping the
+    # state of the previous page, and every callback with outputs on the page makes its initial call
+    def navigate(self, page):
+        old = set(self.shown) - set(self.root)
+        self.values = {key: value for key, value in self.values.items() if key.rsplit('.', 1)[0] not in old}
+        self.values['url.pathname'] = page
+        self.page = page
+        self.shown = {**self.root, **self.pages[page]}
+        for output, dependency in self.dependencies.items():
+            if not self.callable(output, dependency):
+                continue
+            mounted = any(component in self.pages[page] for component in output_ids(output))
+            if mounted and not dependency.get('prevent_initial_call'):
+                self.call(output, dependency, [])
+            elif 'url.pathname' in self.inputs(dependency):
+                self.call(output, dependency, ['url.pathname'])
+
+    # Calls the server callbacks of the shown page triggered by a change of key, and keeps the props they update
+    def change(self, key, value):
+        self.values[key] = value
+        for output, dependency in self.dependencies.items():
+            if key in self.inputs(dependency) and self.callable(output, dependency):
+                self.call(output, dependency, [key])
+
+    def search(self, key, choices):
+        typed = str(self.rng.choice(choices))
+        for length in range(1, len(typed) + 1):
+            self.change(key, typed[:length])
+
+    def step(self):
+        actions = ['navigate'] + PAGE_ACTIONS[self.page]
+        action = self.rng.choices(actions, weights=[ACTION_WEIGHTS[action] for action in actions])[0]
+        if action == 'navigate':
+            self.navigate(self.rng.choice([page for page in PAGES if page != self.page]))
+        elif action == 'runs':
+            self.change('data-toggle-infrastructure.value', subset(self.rng, INFRASTRUCTURE_RUNS))
+        elif action == 'graphs':
+            self.change('graph-toggle-infrastructure.value', subset(self.rng, INFRASTRUCTURE_OPTIONS))
+        elif action == 'car':
+            self.change('car-dropdown.value', self.rng.choice(self.vehicles))
+        elif action == 'car_search':
+            self.search('car-dropdown.search_value', self.vehicles)
+        elif action == 'car_graphs':
+            self.change('graph-toggle-cars.value', subset(self.rng, CAR_OPTIONS))
+        elif action == 'station':
+            self.change('station-dropdown.value', self.rng.choice(self.stations))
+        elif action == 'station_search':
+            self.search('station-dropdown.search_value', self.stations)
+        else:
+            self.change('graph-toggle-stations.value', subset(self.rng, STATION_OPTIONS))
+
+# Callback request bodies from a HAR export or from a file with one JSON body per line
+def load_recording(path):
+    with open(path) as file:
+        if path.endswith('.har'):
+            entries = json.load(file)['log']['entries']
+            return [json.loads(entry['request']['postData']['text']) for entry in entries
+                    if entry['request']['url'].endswith('/_dash-update-component') and entry['request']['method'] == 'POST']
+        return [json.loads(line) for line in file if line.strip()]
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the Dash callbacks in process')
+    parser.add_argument('--design', default='dashboard', help='dashboard module to load')
+    parser.add_argument('--users', type=int, default=50, help='concurrent simulated users')
+    parser.add_argument('--duration', type=float, default=30, help='seconds to run')
+    parser.add_argument('--think', type=float, default=0, help='mean pause between interactions in seconds')
+    parser.add_argument('--replay', help='HAR or JSON-lines file of recorded callback requests')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help='write the report as JSON to this file')
+    args = parser.parse_args()
+
+    design = importlib.import_module(args.design)
+    app = design.app
+    dependencies = {dependency['output']: dependency
+                    for dependency in app.server.test_client().get('/_dash-dependencies').get_json()
+                    if not dependency.get('clientside_function')}
+    recording = load_recording(args.replay) if args.replay else None
+
+    lock = threading.Lock()
+    samples = []
+    def record(output, seconds, status, size):
+        with lock:
+            samples.append((output, seconds, status, size))
+
+    memory = [rss_bytes()]
+    stop = threading.Event()
+    def monitor():
+        while not stop.wait(0.5):
+            memory.append(rss_bytes())
+
+    deadline = time.perf_counter() + args.duration
+    def run_user(index):
+        rng = random.Random(args.seed + index)
+        user = User(app, dependencies, design, rng, record)
+        position = rng.randrange(len(recording)) if recording else 0
+        while time.perf_counter() < deadline:
+            if recording:
+                payload = recording[position % len(recording)]
+                user.post(payload['output'], payload)
+                position += 1
+            else:
+                user.step()
+            if args.think:
+                time.sleep(rng.expovariate(1 / args.think))
+
+    threads = [threading.Thread(target=run_user, args=(index,)) for index in range(args.users)]
+    threading.Thread(target=monitor, daemon=True).start()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    gc.collect()
+    memory.append(rss_bytes())
+
+    names = {output: getattr(entry.get('callback'), '__name__', output) for output, entry in app.callback_map.items()}
+    by_callback = {}
+    for output, seconds, status, size in samples:
+        by_callback.setdefault(names.get(output, output), []).append((seconds, status, size))
+
+    def summary(entries):
+        latencies = sorted(seconds for seconds, _, _ in entries)
+        return {
+            'requests': len(entries),
+            'errors': sum(1 for _, status, _ in entries if status >= 400),
+            'throughput': len(entries) / elapsed,
+            'p50_ms': percentile(latencies, 0.5) * 1000,
+            'p90_ms': percentile(latencies, 0.9) * 1000,
+            'p99_ms': percentile(latencies, 0.99) * 1000,
+            'max_ms': latencies[-1] * 1000,
+            'mean_bytes': sum(size for _, _, size in entries) / len(entries),
+        }
+
+    report = {
+        'users': args.users,
+        'seconds': elapsed,
+        'total': summary([(seconds, status, size) for _, seconds, status, size in samples]) if samples else {},
+        'callbacks': {name: summary(entries) for name, entries in sorted(by_callback.items())},
+        # The resident size is read from /proc, where there is one
+        'memory': {
+            'start_mb': memory[0] / 2**20,
+            'peak_mb': max(memory) / 2**20,
+            'end_mb': memory[-1] / 2**20,
+            'growth_mb': (memory[-1] - memory[0]) / 2**20,
+        } if None not in memory else None,
+    }
+
+    print(f'{args.users} users, {elapsed:.1f}s')
+    print(f'{"callback":<32} {"requests":>8} {"errors":>6} {"req/s":>8} {"p50 ms":>8} {"p90 ms":>8} {"p99 ms":>8} {"max ms":>8}')
+    for name, result in list(report['callbacks'].items()) + [('total', report['total'])]:
+        if result:
+            print(f'{name:<32} {result["requests"]:>8} {result["errors"]:>6} {result["throughput"]:>8.1f} '
+                  f'{result["p50_ms"]:>8.1f} {result["p90_ms"]:>8.1f} {result["p99_ms"]:>8.1f} {result["max_ms"]:>8.1f}')
+    memory_report = report['memory']
+    if memory_report:
+        print(f'memory: {memory_report["start_mb"]:.0f} MB at start, {memory_report["peak_mb"]:.0f} MB peak, '
+              f'{memory_report["end_mb"]:.0f} MB at end ({memory_report["growth_mb"]:+.1f} MB)')
+    if args.out:
+        with open(args.out, 'w') as file:
+            json.dump(report, file, indent=1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+import collections
+import html
+import os
+import sys
+import types
+
+import numpy as np
+import pandas as pd
+from flask import jsonify, request
+
+from admin import admin_only
+from startup_profile import rss_bytes
+
+# Memory accounting of the loaded runs, precomputed aggregates, indexes and caches of one process.
+# GET /memory shows a table per group with the worker total next to the resident size of the process;
+# GET /memory?format=json returns the same numbers. Every gunicorn worker reports only itself.
+
+# Objects whose size is not part of the data they hold
+_SKIPPED = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+# Bytes held by obj and everything reachable from it, each object counted once.
+# Frames and arrays count their buffers, including the strings of object columns.
+def deep_size(obj):
+    seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or isinstance(item, _SKIPPED):
+            continue
+        seen.add(id(item))
+        if isinstance(item, pd.DataFrame):
+            size += int(item.memory_usage(deep=True, index=True).sum())
+        elif isinstance(item, (pd.Series, pd.Index)):
+            size += int(item.memory_usage(deep=True))
+        elif isinstance(item, np.ndarray):
+            size += sys.getsizeof(item) if item.base is None else item.nbytes
+            if item.dtype == object:
+                stack.extend(item.ravel())
+        else:
+            size += sys.getsizeof(item)
+            if isinstance(item, dict):
+                stack.extend(item.keys())
+                stack.extend(item.values())
+            elif isinstance(item, (list, tuple, set, frozenset, collections.deque)):
+                stack.extend(item)
+            elif hasattr(item, '__dict__'):
+                stack.append(vars(item))
+    return size
+
+# sources are functions returning {group: {name: bytes}}; groups listed in outside are shown
+# but not held by this process, like the aggregation service or disk caches
+def collect(sources, outside=()):
+    groups = {}
+    for source in sources:
+        for group, sizes in source().items():
+            groups.setdefault(group, {}).update(sizes)
+    totals = {group: sum(sizes.values()) for group, sizes in groups.items()}
+    return {
+        'pid': os.getpid(),
+        'rss_bytes': rss_bytes(),
+        'groups': groups,
+        'group_totals': totals,
+        'worker_total_bytes': sum(total for group, total in totals.items() if group not in outside),
+    }
+
+def megabytes(size):
+    return f'{size / 2**20:,.2f} MB' if size is not None else 'n/a'
+
+def render_html(report, outside=()):
+    rows = []
+    for group, sizes in report['groups'].items():
+        where = ' (not in this worker)' if group in outside else ''
+        rows.append(f'<tr><th colspan="2">{html.escape(group)}{where}</th>'
+                    f'<th>{megabytes(report["group_totals"][group])}</th></tr>')
+        for name, size in sorted(sizes.items(), key=lambda item: item[1], reverse=True):
+            rows.append(f'<tr><td></td><td>{html.escape(str(name))}</td><td>{megabytes(size)}</td></tr>')
+    tracked = report['worker_total_bytes']
+    rss = report['rss_bytes']
+    rows.append(f'<tr><th colspan="2">worker total</th><th>{megabytes(tracked)}</th></tr>')
+    rows.append(f'<tr><th colspan="2">resident size</th><th>{megabytes(rss)}</th></tr>')
+    if rss is not None:
+        rows.append(f'<tr><td></td><td>interpreter, libraries and untracked</td><td>{megabytes(rss - tracked)}</td></tr>')
+    return ('<!DOCTYPE html><html><head><title>Memory</title><style>'
+            'body{font-family:sans-serif}td,th{padding:2px 12px;text-align:left}td:last-child,th:last-child{text-align:right}'
+            f'</style></head><body><h1>Memory of worker {report["pid"]}</h1><table>{"".join(rows)}</table></body></html>')
+
+def init_memory_report(server, sources, path='/memory', outside=()):
+    @server.route(path)
+    @admin_only
+    def memory_report():
+        report = collect(sources, outside)
+        if request.args.get('format') == 'json':
+            return jsonify(report)
+        return render_html(report, outside)
@@ -0,0 +1,145 @@
+import bisect
+import threading
+import time
+
+from flask import Response, g, request
+
+from admin import admin_only
+from shared_state import SharedCounters
+
+# Per-callback latency, payload size and error metrics of the Dash callbacks, served in the
+# Prometheus text format. Recording is two hook calls and a few counter updates per request,
+# cheap enough to stay on. Every scrape reports the metrics of all gunicorn workers, see shared_state.py;
+# those of the other workers are up to DASH_SHARED_INTERVAL seconds old.
+
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+PAYLOAD_BUCKETS = [1000, 4000, 16000, 64000, 256000, 1000000, 4000000]
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def snapshot(self):
+        return {'counts': list(self.counts), 'sum': self.sum}
+
+# Lines of a histogram snapshot with the given bucket bounds
+def histogram_lines(name, callback, buckets, histogram):
+    cumulative = 0
+    for bound, count in zip(buckets + ['+Inf'], histogram['counts']):
+        cumulative += count
+        yield f'{name}_bucket{{callback="{callback}",le="{bound}"}} {cumulative}'
+    yield f'{name}_sum{{callback="{callback}"}} {histogram["sum"]}'
+    yield f'{name}_count{{callback="{callback}"}} {cumulative}'
+
+# Snapshots of CallbackMetrics added up
+def merge_metrics(snapshots):
+    total = {'latency': {}, 'payload': {}, 'errors': {}}
+    for snapshot in snapshots:
+        for kind in ('latency', 'payload'):
+            for callback, histogram in snapshot[kind].items():
+                sums = total[kind].setdefault(callback, {'counts': [0] * len(histogram['counts']), 'sum': 0})
+                sums['counts'] = [a + b for a, b in zip(sums['counts'], histogram['counts'])]
+                sums['sum'] += histogram['sum']
+        for callback, errors in snapshot['errors'].items():
+            total['errors'][callback] = total['errors'].get(callback, 0) + errors
+    return total
+
+class CallbackMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency = {}
+        self.payload = {}
+        self.errors = {}
+        self.shared = SharedCounters('metrics', self.snapshot, merge_metrics)
+
+    def record(self, callback, seconds, size, error):
+        with self.lock:
+            if callback not in self.latency:
+                self.latency[callback] = Histogram(LATENCY_BUCKETS)
+                self.payload[callback] = Histogram(PAYLOAD_BUCKETS)
+                self.errors[callback] = 0
+            self.latency[callback].observe(seconds)
+            self.payload[callback].observe(size)
+            self.errors[callback] += error
+        self.shared.changed()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'latency': {callback: histogram.snapshot() for callback, histogram in self.latency.items()},
+                'payload': {callback: histogram.snapshot() for callback, histogram in self.payload.items()},
+                'errors': dict(self.errors),
+            }
+
+    # The metrics of all workers
+    def render(self, cache_sources=(), trace_sources=()):
+        merged = self.shared.merged()
+        lines = []
+        lines.append('# HELP dash_callback_duration_seconds Server time of Dash callback requests')
+        lines.append('# TYPE dash_callback_duration_seconds histogram')
+        for callback, histogram in sorted(merged['latency'].items()):
+            lines.extend(histogram_lines('dash_callback_duration_seconds', callback, LATENCY_BUCKETS, histogram))
+        lines.append('# HELP dash_callback_response_bytes Uncompressed size of Dash callback responses')
+        lines.append('# TYPE dash_callback_response_bytes histogram')
+        for callback, histogram in sorted(merged['payload'].items()):
+            lines.extend(histogram_lines('dash_callback_response_bytes', callback, PAYLOAD_BUCKETS, histogram))
+        lines.append('# HELP dash_callback_errors_total Dash callback requests that failed')
+        lines.append('# TYPE dash_callback_errors_total counter')
+        for callback, errors in sorted(merged['errors'].items()):
+            lines.append(f'dash_callback_errors_total{{callback="{callback}"}} {errors}')
+
+        lines.extend(cache_lines('dash_callback_cache', 'Dash callback results', cache_sources))
+        lines.extend(cache_lines('dash_trace_cache', 'Traces of Dash callbacks', trace_sources))
+        return '\n'.join(lines) + '\n'
+
+# Hit and miss counters summed over sources, functions returning {callback: {'hits': n, 'misses': n}}
+def cache_lines(metric, subject, sources):
+    caches = {}
+    for source in sources:
+        for callback, counts in source().items():
+            cache = caches.setdefault(callback, {'hits': 0, 'misses': 0})
+            cache['hits'] += counts['hits']
+            cache['misses'] += counts['misses']
+    lines = []
+    for kind, description in (('hits', 'shared or taken from a cache'), ('misses', 'that had to be computed')):
+        lines.append(f'# HELP {metric}_{kind}_total {subject} {description}')
+        lines.append(f'# TYPE {metric}_{kind}_total counter')
+        for callback, cache in sorted(caches.items()):
+            lines.append(f'{metric}_{kind}_total{{callback="{callback}"}} {cache[kind]}')
+    return lines
+
+callback_metrics = CallbackMetrics()
+
+# Records every server-side callback request of a Dash app and serves the metrics at path.
+# cache_sources and trace_sources are functions returning {callback: {'hits': n, 'misses': n}}, counting
+# whole callback results and the single traces a callback assembles its figures from.
+def init_metrics(app, path='/metrics', cache_sources=(), trace_sources=()):
+    server = app.server
+
+    @server.before_request
+    def start_timer():
+        g.metrics_start = time.perf_counter()
+
+    # Registered after init_compression, so it runs first and sees the uncompressed payload
+    @server.after_request
+    def record_callback(response):
+        # Polls of running background jobs are not callback calls of their own
+        if not request.path.endswith('/_dash-update-component') or 'job' in request.args:
+            return response
+        output = (request.get_json(silent=True) or {}).get('output', '')
+        callback = app.callback_map.get(output, {}).get('callback')
+        name = getattr(callback, '__name__', output or 'unknown')
+        size = 0 if response.direct_passthrough else response.content_length or 0
+        callback_metrics.record(name, time.perf_counter() - g.metrics_start, size, response.status_code >= 500)
+        return response
+
+    @server.route(path)
+    @admin_only
+    def metrics():
+        return Response(callback_metrics.render(cache_sources, trace_sources), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,40 @@
+import contextvars
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Threads aggregating the runs of one callback in parallel. The pandas and numpy kernels doing the work
+# release the GIL, so the wall time of a callback stays close to that of its slowest run.
+TRACE_WORKERS = int(os.environ.get('TRACE_WORKERS', min(8, os.cpu_count() or 1)))
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+# The pool is created on first use in every process; forked gunicorn workers and background jobs
+# do not inherit the threads of their parent
+def get_pool():
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ThreadPoolExecutor(max_workers=TRACE_WORKERS, thread_name_prefix='trace')
+            _pool_pid = os.getpid()
+        return _pool
+
+# Calls function for every item and returns the results in order.
+# Every task runs in a copy of the caller's context, so tracing spans land in the calling request.
+# Must not be nested: a task waiting on tasks of the same pool can starve it.
+def map_parallel(function, items):
+    items = list(items)
+    if TRACE_WORKERS <= 1 or len(items) <= 1:
+        return [function(item) for item in items]
+    contexts = [contextvars.copy_context() for _ in items]
+    return list(get_pool().map(lambda context, item: context.run(function, item), contexts, items))
+
+# Process pool for the exporters. Its workers are spawned, not forked, and set themselves up with
+# initializer(*initargs): a forked worker would inherit the runs of a polars backend loaded here, whose
+# thread pool does not survive a fork, see polars_backend.py.
+def process_pool(workers, initializer=None, initargs=()):
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                               initializer=initializer, initargs=initargs)
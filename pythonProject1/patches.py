@@ -0,0 +1,40 @@
+from dash import Patch
+
+# A figure spec is the ordered list of (figure_key, [trace_key, ...]) a callback renders.
+# Diffing two specs gives the patch that turns the old list of figures into the new one,
+# so figures and traces that did not change are neither rebuilt nor re-sent.
+# Positions are only added and removed, never moved: a kept figure whose kept traces changed their order is
+# rebuilt, and when the kept figures changed their order the whole new list is returned instead of a patch.
+def patch_figures(old_spec, new_spec, build_figure, build_trace):
+    patched = Patch()
+    old_keys = [key for key, _ in old_spec]
+    new_keys = [key for key, _ in new_spec]
+    if [key for key in old_keys if key in new_keys] != [key for key in new_keys if key in old_keys]:
+        return [build_figure(key, traces) for key, traces in new_spec]
+    new_traces_by_key = dict(new_spec)
+
+    # Add and remove traces inside figures that stay, addressed by their current position
+    for index, (key, old_traces) in enumerate(old_spec):
+        if key not in new_traces_by_key:
+            continue
+        new_traces = new_traces_by_key[key]
+        if [trace for trace in old_traces if trace in new_traces] != [trace for trace in new_traces if trace in old_traces]:
+            patched[index] = build_figure(key, new_traces)
+            continue
+        data = patched[index]['data']
+        for position in reversed(range(len(old_traces))):
+            if old_traces[position] not in new_traces:
+                del data[position]
+        for position, trace_key in enumerate(new_traces):
+            if trace_key not in old_traces:
+                data.insert(position, build_trace(key, trace_key))
+
+    # Remove figures back to front, then insert new ones front to back at their final position
+    for index in reversed(range(len(old_keys))):
+        if old_keys[index] not in new_keys:
+            del patched[index]
+    for index, (key, traces) in enumerate(new_spec):
+        if key not in old_keys:
+            patched.insert(index, build_figure(key, traces))
+
+    return patched
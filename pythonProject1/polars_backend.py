@@ -0,0 +1,175 @@
+import os
+
+import pandas as pd
+
+from aggregations import COLUMNS, NUMBERS, Aggregations, time_of_day
+from client_data import build_vehicle_store, build_station_store
+from startup_profile import mark
+from tracing import span
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+# Query backend on the lazy, multi-threaded polars engine, e.g.
+#
+#   AGGREGATION_BACKEND=polars POLARS_MAX_THREADS=8 python dashboard.py
+#
+# The runs are parsed and preprocessed by polars and held in memory as polars frames. Every query is a lazy
+# plan, filter rows → group by time → aggregate, optimized and run by polars on all cores (or
+# POLARS_MAX_THREADS). polars adds in another order than pandas and without its compensation, so sums and means
+# can differ from the pandas backend in the last digits, within aggregations.RELATIVE_TOLERANCE.
+#
+# polars' thread pool does not survive a fork: a process forked after the runs were loaded would hang on its first
+# query. Such processes fail at once instead. gunicorn.conf.py does not preload the app with this backend,
+# process pools must use the spawn start method, as parallel.process_pool() does, and BACKGROUND_CALLBACKS,
+# whose jobs are forked, is refused at startup.
+
+AGGREGATIONS = ('sum', 'mean', 'nunique', 'cumsum')
+
+# preprocess() as polars expressions on the CSV read as text
+def preprocessed(path):
+    numbers = [pl.col(column).str.replace(',', '.', literal=True).cast(pl.Float64) for column in NUMBERS]
+    vehicle = pl.col('vehicle').str.replace(',', '.', literal=True).cast(pl.Float64)
+    return (pl.scan_csv(path, separator=';', infer_schema=False)
+            .filter(vehicle.is_not_null())
+            .select(pl.col('time').cast(pl.Int64), 'type', pl.col('cp').cast(pl.Int64), vehicle.cast(pl.Int64), *numbers)
+            .select(COLUMNS))
+
+class PolarsAggregations(Aggregations):
+    def __init__(self, frames):
+        self.frames = frames
+        self.pid = os.getpid()
+
+    # The runs, in the process that loaded them only
+    def process_frames(self):
+        if os.getpid() != self.pid:
+            raise RuntimeError('the polars backend cannot be used in a process forked after it loaded the runs; '
+                               'start workers without preloading or with the spawn start method')
+        return self.frames
+
+    def runs(self):
+        return list(self.frames)
+
+    def first_appearance(self, column):
+        columns = [frame[column] for frame in self.process_frames().values()]
+        return pl.concat(columns).unique(maintain_order=True).to_list()
+
+    def vehicles(self):
+        return self.first_appearance('vehicle')
+
+    def stations(self):
+        return self.first_appearance('cp')
+
+    def times(self, dataset):
+        return time_of_day(self.process_frames()[dataset]['time'].unique(maintain_order=True).to_numpy()).array
+
+    def query(self, dataset, aggregates, vehicle=None, cp=None, window=None, positive=None):
+        conditions = []
+        if vehicle is not None:
+            conditions.append(pl.col('vehicle') == int(vehicle))
+        if cp is not None:
+            conditions.append(pl.col('cp') == int(cp))
+        if window is not None:
+            conditions.append(pl.col('time').is_between(window[0], window[1], closed='left'))
+        if positive is not None:
+            # polars orders NaN above every number, pandas' comparisons are false for it
+            conditions.append(self.without_nan(dataset, positive) > 0)
+        for column, how in aggregates.values():
+            if column not in COLUMNS or how not in AGGREGATIONS:
+                raise ValueError(f'unsupported aggregate {how!r} of {column!r}')
+        pairs = list(dict.fromkeys(aggregates.values()))
+
+        rows = self.process_frames()[dataset].lazy()
+        if conditions:
+            rows = rows.filter(*conditions)
+        plan = rows.group_by('time').agg(*[self.aggregate(dataset, column, how) for column, how in pairs]).sort('time')
+        with span('query'):
+            groups = plan.collect()
+
+        series = {}
+        with span('convert'):
+            index = time_of_day(groups['time'].to_numpy())
+            for name, (column, how) in aggregates.items():
+                values = pd.Series(groups[f'{column} {how}'].to_numpy(), index=index, name=column)
+                if how == 'cumsum':
+                    values = values.cumsum()
+                series[name] = values
+        return series
+
+    # A column with NaN as missing values, which pandas skips and polars would take as values
+    def without_nan(self, dataset, column):
+        values = pl.col(column)
+        if self.frames[dataset].schema[column].is_float():
+            values = values.fill_nan(None)
+        return values
+
+    # Per time, the aggregate of a column without NaN
+    def aggregate(self, dataset, column, how):
+        values = self.without_nan(dataset, column)
+        if how == 'nunique':
+            values = values.drop_nulls().n_unique().cast(pl.Int64)
+        elif how == 'mean':
+            values = values.mean()
+        else:
+            values = values.sum()
+        return values.alias(f'{column} {how}')
+
+    # The state of charge of every vehicle at its first and last row comes back in row order and is averaged
+    # in pandas, as calculate_kpis() does
+    def kpis(self, dataset):
+        frame = self.process_frames()[dataset]
+        rows = frame.lazy()
+        idle = ((pl.col('cp_charge_increment') == 0) & (pl.col('cp_charging_rate') == 0)
+                & (pl.col('cp_target_power') == 0)).fill_null(False)
+        counts, per_vehicle = pl.collect_all([
+            rows.select(
+                charged=pl.col('vehicle').filter(self.without_nan(dataset, 'vehicle_charge') > 0).n_unique(),
+                not_charged=pl.col('vehicle').filter(pl.col('vehicle_charge') == 0).n_unique()),
+            rows.with_row_index('row').group_by('vehicle').agg(
+                first_row=pl.col('row').first(), first_soc=pl.col('vehicle_soc').first(),
+                last_row=pl.col('row').last(), last_soc=pl.col('vehicle_soc').last(),
+                stopped=(pl.len() >= 3) & idle.tail(3).all()),
+        ])
+        total_energy_used = pd.Series(frame['cp_charge_increment'].to_numpy()).sum()
+        first_soc = pd.Series(per_vehicle.sort('first_row')['first_soc'].to_numpy())
+        soc_after = pd.Series(per_vehicle.filter(pl.col('stopped')).sort('last_row')['last_soc'].to_numpy())
+        return (total_energy_used, counts['charged'].item(), counts['not_charged'].item(),
+                soc_after.mean(), soc_after.median(), first_soc.mean())
+
+    # The runs as pandas frames, only for the series stores shipped to the browser
+    def pandas_frames(self):
+        data_map = {}
+        for dataset, frame in self.process_frames().items():
+            df = pd.DataFrame({column: frame[column].to_numpy() for column in COLUMNS})
+            df['time_of_day'] = time_of_day(df['time'])
+            data_map[dataset] = df
+        return data_map
+
+    def vehicle_store(self):
+        return build_vehicle_store(self.pandas_frames())
+
+    def station_store(self):
+        return build_station_store(self.pandas_frames())
+
+    def memory_usage(self):
+        return {'runs': {dataset: frame.estimated_size() for dataset, frame in self.frames.items()}}
+
+def require_polars():
+    if pl is None:
+        raise ImportError('AGGREGATION_BACKEND=polars needs polars: pip install polars')
+
+def create_polars_aggregations(run_files):
+    require_polars()
+    frames = {}
+    for dataset, path in run_files.items():
+        frames[dataset] = preprocessed(path).collect()
+        mark(f'load {dataset}')
+    return PolarsAggregations(frames)
+
+# A polars backend over runs already preprocessed by pandas, as the benchmark builds them
+def polars_aggregations_from_pandas(data_map):
+    require_polars()
+    return PolarsAggregations({dataset: pl.DataFrame({column: df[column].to_numpy() for column in COLUMNS})
+                               for dataset, df in data_map.items()})
@@ -0,0 +1,32 @@
+import bisect
+
+PAGE_SIZE = 50
+
+# Prefix index over the vehicle or charge point ids of all loaded runs.
+# Dropdowns query it with what the user typed and only ever receive one bounded page of options.
+class PrefixIndex:
+    def __init__(self, values):
+        self.values = sorted(set(values))
+        self.keys = sorted((str(value), value) for value in self.values)
+
+    def first(self):
+        return self.values[0]
+
+    def search(self, prefix, limit=PAGE_SIZE):
+        if not prefix:
+            return self.values[:limit]
+        prefix = str(prefix).strip()
+        start = bisect.bisect_left(self.keys, (prefix,))
+        matches = []
+        for key, value in self.keys[start:start + limit]:
+            if not key.startswith(prefix):
+                break
+            matches.append(value)
+        return sorted(matches)
+
+    # Dropdown options for one page of matches, always including the selected value
+    def options(self, prefix, selected=None, limit=PAGE_SIZE):
+        values = self.search(prefix, limit)
+        if selected is not None and selected not in values:
+            values = [selected] + values
+        return [{'label': value, 'value': value} for value in values]
@@ -0,0 +1,92 @@
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+
+# State the gunicorn workers share through files in DASH_SHARED_DIR, which gunicorn.conf.py creates for
+# every server run. The workers share one listening socket, so a request to an admin endpoint reaches an
+# arbitrary worker; the endpoints answer from the files of all of them. Without DASH_SHARED_DIR, e.g. under
+# the development server, every process reports only itself.
+#
+# Counters: every process writes a snapshot of its counters to <name>-<pid>.json after a change, at most every
+# DASH_SHARED_INTERVAL seconds and once more at exit. Readers merge the snapshots of all processes with their
+# own live counters. Snapshots of exited workers stay, so merged counters do not go back when a worker restarts.
+
+SHARED_INTERVAL = float(os.environ.get('DASH_SHARED_INTERVAL', '1'))
+
+def shared_dir():
+    return os.environ.get('DASH_SHARED_DIR')
+
+def write_json(path, data):
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'w') as file:
+        json.dump(data, file)
+    os.replace(temporary, path)
+
+# Counters of one kind, snapshot() returning those of this process as JSON data and merge(snapshots) adding
+# up a list of them
+class SharedCounters:
+    def __init__(self, name, snapshot, merge):
+        self.name = name
+        self.snapshot = snapshot
+        self.merge = merge
+        self.lock = threading.Lock()
+        self.changes = threading.Event()
+        self.writer_pid = None
+
+    def path(self, directory, pid):
+        return os.path.join(directory, f'{self.name}-{pid}.json')
+
+    def write(self):
+        directory = shared_dir()
+        if directory:
+            write_json(self.path(directory, os.getpid()), self.snapshot())
+
+    def run_writer(self):
+        while True:
+            self.changes.wait()
+            self.changes.clear()
+            self.write()
+            time.sleep(SHARED_INTERVAL)
+
+    # Called after the counters changed; the writer thread of a process is started on its first change,
+    # forked workers do not inherit the one of their parent
+    def changed(self):
+        if not shared_dir():
+            return
+        if self.writer_pid != os.getpid():
+            with self.lock:
+                if self.writer_pid != os.getpid():
+                    self.writer_pid = os.getpid()
+                    self.changes = threading.Event()
+                    threading.Thread(target=self.run_writer, name=f'{self.name}-writer', daemon=True).start()
+                    atexit.register(self.write)
+        self.changes.set()
+
+    # The counters of every process, this one's live
+    def merged(self):
+        snapshots = [self.snapshot()]
+        directory = shared_dir()
+        if directory:
+            own = self.path(directory, os.getpid())
+            for path in glob.glob(os.path.join(directory, f'{self.name}-*.json')):
+                if path == own:
+                    continue
+                try:
+                    with open(path) as file:
+                        snapshots.append(json.load(file))
+                except (OSError, ValueError):
+                    continue
+        return self.merge(snapshots)
+
+# {name: {counter: n}} snapshots added up
+def add_counters(snapshots):
+    total = {}
+    for snapshot in snapshots:
+        for name, counters in snapshot.items():
+            sums = total.setdefault(name, {})
+            for counter, value in counters.items():
+                sums[counter] = sums.get(counter, 0) + value
+    return total
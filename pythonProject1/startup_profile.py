@@ -0,0 +1,121 @@
+import builtins
+import json
+import os
+import resource
+import sys
+import threading
+import time
+
+# Startup profile: STARTUP_PROFILE=1 python dashboard.py
+#
+# Reports the wall time, resident memory and peak memory after every startup phase, the slowest module
+# imports and the time from process start to the first served request. The design imports this module
+# before anything else, so the import times cover dash, plotly and pandas. With STARTUP_PROFILE_OUT the
+# report is also written as JSON.
+
+STARTUP_PROFILE = os.environ.get('STARTUP_PROFILE') == '1'
+STARTUP_PROFILE_OUT = os.environ.get('STARTUP_PROFILE_OUT')
+TOP_IMPORTS = 20
+
+def process_start_time():
+    try:
+        with open('/proc/self/stat') as file:
+            started_ticks = int(file.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as file:
+            uptime = float(file.read().split()[0])
+        return time.time() - uptime + started_ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError):
+        return time.time()
+
+# Resident size of this process, None without /proc. It lives here rather than in memory_report, which imports
+# it: this module is imported before pandas and must not import it itself.
+def rss_bytes():
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        return None
+
+def rss_mb():
+    rss = rss_bytes()
+    return rss / 2**20 if rss is not None else 0.0
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+_phases = []
+_imports = {}
+_import_stack = []
+_original_import = builtins.__import__
+_last_mark = time.perf_counter()
+_started = process_start_time()
+_clock_offset = time.time() - time.perf_counter()
+
+# Times every first import of a module; nested imports count towards the importing module's total
+# but not its self time, like python -X importtime
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level == 0 and name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+    start = time.perf_counter()
+    _import_stack.append(0.0)
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = time.perf_counter() - start
+        children = _import_stack.pop()
+        if _import_stack:
+            _import_stack[-1] += elapsed
+        label = name if level == 0 else '.' * level + name
+        total, own = _imports.get(label, (0.0, 0.0))
+        _imports[label] = (total + elapsed, own + elapsed - children)
+
+if STARTUP_PROFILE:
+    builtins.__import__ = _timed_import
+    _phases.append({'phase': 'interpreter start', 'seconds': _last_mark + _clock_offset - _started,
+                    'rss_mb': rss_mb(), 'peak_mb': peak_rss_mb()})
+
+# Ends the current startup phase under the given name
+def mark(name):
+    global _last_mark
+    if not STARTUP_PROFILE:
+        return
+    now = time.perf_counter()
+    _phases.append({'phase': name, 'seconds': now - _last_mark, 'rss_mb': rss_mb(), 'peak_mb': peak_rss_mb()})
+    _last_mark = now
+
+def report():
+    since_start = time.perf_counter() + _clock_offset - _started
+    top_level = [(name, times) for name, times in _imports.items() if not name.startswith('.') and '.' not in name]
+    imports = sorted(top_level, key=lambda item: item[1][0], reverse=True)[:TOP_IMPORTS]
+    lines = ['startup profile', f'{"phase":<32} {"ms":>9} {"rss MB":>8} {"peak MB":>8}']
+    for entry in _phases:
+        lines.append(f'{entry["phase"]:<32} {entry["seconds"] * 1000:>9.1f} {entry["rss_mb"]:>8.1f} {entry["peak_mb"]:>8.1f}')
+    lines.append(f'{"ready, since process start":<32} {since_start * 1000:>9.1f}')
+    lines.append('')
+    lines.append(f'{"slowest imports":<32} {"total ms":>9} {"self ms":>8}')
+    for name, (total, own) in imports:
+        lines.append(f'{name:<32} {total * 1000:>9.1f} {own * 1000:>8.1f}')
+    print('\n'.join(lines), file=sys.stderr, flush=True)
+    return {'phases': _phases, 'ready_seconds': since_start,
+            'imports': {name: {'total': total, 'self': own} for name, (total, own) in imports}}
+
+# Ends the profile once the app is built: restores the import function, prints the report and
+# reports the time to the first served request
+def finish(server):
+    if not STARTUP_PROFILE:
+        return
+    mark('callbacks')
+    builtins.__import__ = _original_import
+    result = report()
+    if STARTUP_PROFILE_OUT:
+        with open(STARTUP_PROFILE_OUT, 'w') as file:
+            json.dump(result, file, indent=1)
+
+    first_request = threading.Lock()
+    @server.after_request
+    def report_first_request(response):
+        if first_request.acquire(blocking=False):
+            print(f'first request served {time.time() - _started:.2f}s after process start',
+                  file=sys.stderr, flush=True)
+        return response
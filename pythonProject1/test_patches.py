@@ -0,0 +1,75 @@
+import copy
+
+import pytest
+
+from patches import patch_figures
+
+# Figures are {'key': ..., 'data': [trace, ...]} here, traces their (figure, trace) keys
+def build_figure(key, traces):
+    return {'key': key, 'data': [build_trace(key, trace) for trace in traces]}
+
+def build_trace(key, trace):
+    return (key, trace)
+
+def render(spec):
+    return [build_figure(key, traces) for key, traces in spec]
+
+# Applies the operations of a Patch in order, as dash-renderer does
+def apply(patch, figures):
+    figures = copy.deepcopy(figures)
+    for operation in patch.to_plotly_json()['operations']:
+        *path, last = operation['location'] or [None]
+        target = figures
+        for step in path:
+            target = target[step]
+        if operation['operation'] == 'Delete':
+            del target[last]
+        elif operation['operation'] == 'Assign':
+            target[last] = operation['params']['value']
+        elif operation['operation'] == 'Insert':
+            target = target if last is None else target[last]
+            target.insert(operation['params']['index'], operation['params']['value'])
+        else:
+            raise AssertionError(f'unexpected operation {operation["operation"]}')
+    return figures
+
+def patched(old_spec, new_spec):
+    result = patch_figures(old_spec, new_spec, build_figure, build_trace)
+    return result if isinstance(result, list) else apply(result, render(old_spec))
+
+@pytest.mark.parametrize('old_spec, new_spec', [
+    # traces added at the front, in the middle and at the end
+    ([('power', ['b'])], [('power', ['a', 'b', 'c'])]),
+    ([('power', ['a', 'c'])], [('power', ['a', 'b', 'c', 'd'])]),
+    # traces removed
+    ([('power', ['a', 'b', 'c', 'd'])], [('power', ['b', 'd'])]),
+    # traces added and removed at once
+    ([('power', ['a', 'b', 'c'])], [('power', ['b', 'd'])]),
+    # figures added and removed
+    ([('power', ['a'])], [('energy', ['e']), ('power', ['a']), ('cars', ['c'])]),
+    ([('energy', ['e']), ('power', ['a']), ('cars', ['c'])], [('power', ['a'])]),
+    ([('energy', ['e']), ('power', ['a'])], [('power', ['a', 'b']), ('cars', ['c'])]),
+    # everything removed, and everything added
+    ([('power', ['a']), ('cars', ['c'])], []),
+    ([], [('power', ['a']), ('cars', ['c'])]),
+    # traces reordered, with and without added ones
+    ([('power', ['a', 'b'])], [('power', ['b', 'a'])]),
+    ([('power', ['a', 'b']), ('cars', ['c'])], [('power', ['b', 'x', 'a']), ('cars', ['c'])]),
+    # figures reordered, with and without added and removed ones
+    ([('power', ['a']), ('cars', ['c'])], [('cars', ['c']), ('power', ['a'])]),
+    ([('power', ['a']), ('energy', ['e']), ('cars', ['c'])], [('cars', ['c', 'd']), ('new', ['n']), ('power', ['a'])]),
+])
+def test_patch_turns_old_figures_into_new(old_spec, new_spec):
+    assert patched(old_spec, new_spec) == render(new_spec)
+
+def test_unchanged_spec_is_an_empty_patch():
+    spec = [('power', ['a', 'b']), ('cars', ['c'])]
+    assert patch_figures(spec, spec, build_figure, build_trace).to_plotly_json()['operations'] == []
+
+def test_kept_traces_are_not_rebuilt():
+    built = []
+    def build_trace_once(key, trace):
+        built.append(trace)
+        return build_trace(key, trace)
+    patch_figures([('power', ['a', 'c'])], [('power', ['a', 'b', 'c'])], build_figure, build_trace_once)
+    assert built == ['b']
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregations import COLUMNS, PandasAggregations, same_results, time_of_day
+
+pytest.importorskip('polars')
+from polars_backend import polars_aggregations_from_pandas
+
+# Per time: plain values, a NaN among them, only NaN, an infinite value, both infinities, and many values of
+# mixed magnitude whose sums depend on the order of the additions
+GROUPS = {
+    0: [1.5, 2.25, 3.0],
+    60: [1.0, np.nan, 2.0],
+    120: [np.nan, np.nan],
+    180: [1.0, np.inf, 2.0],
+    240: [np.inf, 1.0, -np.inf],
+    300: list(np.random.default_rng(7).normal(0, 1, 1000) * 10.0 ** np.random.default_rng(8).integers(-6, 6, 1000)),
+}
+
+def run():
+    rows = []
+    for time, values in GROUPS.items():
+        for position, value in enumerate(values):
+            row = dict.fromkeys(COLUMNS, 0.0)
+            row.update(time=time, type='event', cp=position % 3, vehicle=time // 60 * 10 + position % 5, cp_target_power=value,
+                       cp_charging_rate=value, vehicle_soc=position / len(values), vehicle_charge=value,
+                       cp_charge_increment=value)
+            rows.append(row)
+    df = pd.DataFrame(rows, columns=COLUMNS).astype({'time': 'int64', 'cp': 'int64', 'vehicle': 'int64'})
+    df['time_of_day'] = time_of_day(df['time'])
+    return {'run': df}
+
+@pytest.fixture(scope='module')
+def backends():
+    data_map = run()
+    return PandasAggregations(data_map), polars_aggregations_from_pandas(data_map)
+
+@pytest.mark.parametrize('how', ['sum', 'mean', 'cumsum'])
+def test_sums_match_pandas_groupby(backends, how):
+    pandas_backend, polars_backend = backends
+    expected = pandas_backend.query('run', {how: ('cp_target_power', how)})[how]
+    actual = polars_backend.query('run', {how: ('cp_target_power', how)})[how]
+    assert same_results(expected, actual)
+
+def test_nan_empty_and_infinite_groups(backends):
+    _, polars_backend = backends
+    series = polars_backend.query('run', {'sum': ('cp_target_power', 'sum'), 'mean': ('cp_target_power', 'mean')})
+    sums, means = series['sum'].to_numpy(), series['mean'].to_numpy()
+    assert sums[1] == 3.0 and means[1] == 1.5
+    assert sums[2] == 0.0 and np.isnan(means[2])
+    assert sums[3] == np.inf and means[3] == np.inf
+    assert np.isnan(sums[4]) and np.isnan(means[4])
+
+@pytest.mark.parametrize('selection', [
+    {},
+    {'vehicle': 1},
+    {'cp': 2},
+    {'vehicle': 1, 'cp': 1},
+    {'window': (60, 240)},
+    {'positive': 'cp_charging_rate'},
+])
+def test_filtered_queries_match_pandas(backends, selection):
+    pandas_backend, polars_backend = backends
+    aggregates = {'power': ('cp_target_power', 'sum'), 'rate': ('cp_charging_rate', 'mean'),
+                  'energy': ('cp_charge_increment', 'cumsum'), 'cars': ('vehicle', 'nunique')}
+    expected = pandas_backend.query('run', aggregates, **selection)
+    actual = polars_backend.query('run', aggregates, **selection)
+    for name in aggregates:
+        assert same_results(expected[name], actual[name]), name
+
+# The total energy adds both infinities
+@pytest.mark.filterwarnings('ignore:invalid value encountered:RuntimeWarning')
+def test_kpis_match_pandas(backends):
+    pandas_backend, polars_backend = backends
+    assert same_results(pandas_backend.kpis('run'), polars_backend.kpis('run'))
+
+def test_same_results_tells_differences_apart():
+    index = time_of_day([0, 60])
+    series = pd.Series([1.0, 2.0], index=index)
+    assert same_results(series, series * (1 + 1e-12))
+    assert not same_results(series, series * (1 + 1e-6))
+    assert not same_results(series, pd.Series([1.0, np.nan], index=index))
+    assert not same_results(series, pd.Series([1.0, 2.0], index=time_of_day([0, 120])))
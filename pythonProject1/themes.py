@@ -0,0 +1,120 @@
+import plotly.graph_objs as go
+
+# Figure templates are built and validated once at startup; callbacks only set title and axis labels
+def build_template(plot_bgcolor, paper_bgcolor, font_color):
+    template = go.layout.Template(layout=go.Layout(
+        title={'font': {'size': 24}},
+        xaxis={'tickformat': '%H:%M'},
+        barmode='group',
+        plot_bgcolor=plot_bgcolor,
+        paper_bgcolor=paper_bgcolor,
+        font=dict(color=font_color),
+        legend=dict(orientation='h', xanchor='right', x=1, y=-0.2),
+        hovermode='x unified'
+    ))
+    return template.to_plotly_json()
+
+THEMES = {
+    'dark': {
+        'template': build_template('rgba(74, 74, 74, 1)', 'rgba(44, 44, 44, 1)', 'white'),
+        'hr_style': {'border': '1px solid white', 'margin-top': '20px', 'margin-bottom': '20px'},
+        'style_header': {
+            'backgroundColor': 'rgb(30, 30, 30)',
+            'color': 'white',
+            'fontWeight': 'bold',
+            'border': '1px solid black',
+        },
+        'style_cell': {
+            'backgroundColor': 'rgb(50, 50, 50)',
+            'color': 'white',
+            'textAlign': 'left',
+            'padding': '10px',
+            'border': '1px solid black',
+        },
+        'style_data': {
+            'border': '1px solid grey',
+        },
+        'style_data_conditional': [
+            {
+                'if': {'state': 'selected'},
+                'backgroundColor': 'rgb(70, 70, 70)',
+                'color': 'white'
+            },
+            {
+                'if': {'state': 'active'},
+                'backgroundColor': 'rgb(90, 90, 90)',
+                'color': 'white'
+            }
+        ],
+    },
+    'light': {
+        'template': build_template('rgba(240, 240, 240, 1)', 'rgba(255, 255, 255, 1)', 'black'),
+        'hr_style': {'border': '1px solid lightgrey', 'margin-top': '20px', 'margin-bottom': '20px'},
+        'style_header': {
+            'backgroundColor': 'rgb(240, 240, 240)',
+            'color': 'black',
+            'fontWeight': 'bold',
+            'border': '1px rgb(240, 240, 240)',
+        },
+        'style_cell': {
+            'backgroundColor': 'rgb(255, 255, 255)',
+            'color': 'black',
+            'textAlign': 'left',
+            'padding': '10px',
+            'border': '1px solid white',
+        },
+        'style_data': {
+            'border': '1px solid white',
+        },
+        'style_data_conditional': [
+            {
+                'if': {'state': 'selected'},
+                'backgroundColor': 'rgb(200, 230, 255)',
+                'color': 'black'
+            },
+            {
+                'if': {'state': 'active'},
+                'backgroundColor': 'rgb(220, 240, 255)',
+                'color': 'black'
+            }
+        ],
+    },
+}
+
+# Y axes shared by the graphs of all pages
+POWER_AXIS = {'title': {'text': 'Power (kW)'}, 'tickformat': ',.0f'}
+ENERGY_AXIS = {'title': {'text': 'Energy (kWh)'}, 'tickformat': ',.0f'}
+SOC_AXIS = {'title': {'text': 'State of Charge (%)'}, 'tickformat': ',.0f', 'range': [0, 100]}
+EV_COUNT_AXIS = {'title': {'text': 'Number of EVs'}}
+
+# Plain figure dict, so plotly does not validate the whole layout again for every graph.
+# Figures carry no theme, so every session shares them; the theme template is applied when
+# they are arranged. separate lists the (run, title) pairs the browser uses to split the figure per run.
+def make_figure(traces, title, yaxis, separate=None):
+    layout = {
+        'title': {'text': title},
+        'xaxis': {'title': {'text': 'Time'}},
+        'yaxis': yaxis,
+    }
+    if separate is not None:
+        layout['meta'] = {'separate': [{'run': run, 'title': run_title} for run, run_title in separate]}
+    return {'data': traces, 'layout': layout}
+
+# Plain scatter trace dict; plotly validates every property of a go.Scatter while holding the GIL,
+# which would serialise the runs aggregated in parallel
+def make_trace(x, y, **properties):
+    return dict(type='scatter', x=x, y=y, **properties)
+
+# Server-side counterpart of views.arrange in assets/clientside.js
+def arrange_figures(figures, view, theme):
+    template = THEMES[theme]['template']
+    if view != 'separate':
+        return [{'data': figure['data'], 'layout': dict(figure['layout'], template=template)} for figure in figures]
+    arranged = []
+    for figure in figures:
+        for part in figure['layout']['meta']['separate']:
+            arranged.append({
+                'data': [trace for trace in figure['data'] if trace['meta'] == part['run']],
+                'layout': dict(figure['layout'], template=template, title={'text': part['title']}),
+            })
+    return arranged
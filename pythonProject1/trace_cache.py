@@ -0,0 +1,69 @@
+import collections
+import os
+import threading
+
+from memory_report import deep_size
+from shared_state import SharedCounters, add_counters
+
+# Least recently used cache of the per-run traces of the graph callbacks. Every trace of one run,
+# option and vehicle or station is aggregated once; the figures of any selection, view or theme are
+# then assembled from cached traces. The runs do not change while the app runs, so entries never
+# go stale. The cache is per process, every gunicorn worker has its own; its counters are reported summed
+# over all workers, see shared_state.py.
+TRACE_CACHE_SIZE = int(os.environ.get('TRACE_CACHE_SIZE', '2048'))
+
+class TraceCache:
+    def __init__(self, size, name):
+        self.size = size
+        self.lock = threading.Lock()
+        self.entries = collections.OrderedDict()
+        self.counters = {}
+        self.shared = SharedCounters(name, self.stats, add_counters)
+
+    # Returns {key: trace} for keys, computing the missing ones at once with compute(missing_keys).
+    # Traces are shared between callers and must not be mutated.
+    def get_many(self, name, keys, compute):
+        found = {}
+        with self.lock:
+            for key in keys:
+                trace = self.entries.get((name, key))
+                if trace is not None:
+                    self.entries.move_to_end((name, key))
+                    found[key] = trace
+            missing = [key for key in keys if key not in found]
+            counters = self.counters.setdefault(name, {'hits': 0, 'misses': 0})
+            counters['hits'] += len(found)
+            counters['misses'] += len(missing)
+        self.shared.changed()
+        if not missing:
+            return found
+
+        computed = compute(missing)
+        with self.lock:
+            for key, trace in computed.items():
+                self.entries[(name, key)] = trace
+                self.entries.move_to_end((name, key))
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+        found.update(computed)
+        return found
+
+    # Drops every trace, needed only when the runs behind them are replaced
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            return {name: dict(counters) for name, counters in self.counters.items()}
+
+trace_cache = TraceCache(TRACE_CACHE_SIZE, 'trace-cache')
+
+# Per callback, the traces taken from the caches of all workers and the ones that had to be aggregated
+def cache_stats():
+    return trace_cache.shared.merged()
+
+def memory_usage():
+    with trace_cache.lock:
+        traces = list(trace_cache.entries.values())
+    return {'caches': {'trace cache': deep_size(traces)}}
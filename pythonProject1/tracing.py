@@ -0,0 +1,191 @@
+import collections
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+
+from flask import Response, request
+
+from admin import admin_only
+from memory_report import deep_size
+from shared_state import shared_dir, write_json
+
+# Named spans timing the phases of one callback request (aggregation steps, trace and figure building).
+# Off by default; switched on and off at runtime with POST /tracing enabled=1|0. The switch is shared by all
+# gunicorn workers through the file tracing.json in DASH_SHARED_DIR, see shared_state.py: every worker looks
+# at it at most every SWITCH_CHECK_INTERVAL seconds, when a callback request starts. The recent traces are
+# kept per worker; GET /tracing shows those of the worker that answered, named by its pid.
+# While off, span() only checks a flag.
+
+TRACE_HISTORY = 50
+SWITCH_CHECK_INTERVAL = 1
+
+enabled = os.environ.get('TRACING') == '1'
+traces = collections.deque(maxlen=TRACE_HISTORY)
+
+_spans = contextvars.ContextVar('spans', default=None)
+_path = contextvars.ContextVar('span_path', default=())
+_root = contextvars.ContextVar('span_root', default=None)
+_noop = contextlib.nullcontext()
+
+class _Span:
+    def __init__(self, spans, name):
+        self.spans = spans
+        self.name = name
+
+    def __enter__(self):
+        self.path = _path.get() + (self.name,)
+        self.token = _path.set(self.path)
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        duration = time.perf_counter() - self.start
+        _path.reset(self.token)
+        self.spans.append((self.path, self.start, duration))
+
+def span(name):
+    if not enabled:
+        return _noop
+    spans = _spans.get()
+    if spans is None:
+        return _noop
+    return _Span(spans, name)
+
+# Records the whole call of a function as one span
+def traced(function):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        with span(function.__name__):
+            return function(*args, **kwargs)
+    return wrapper
+
+def start_trace():
+    if enabled:
+        _spans.set([])
+        _root.set(time.perf_counter())
+
+def finish_trace(name):
+    spans, start = _spans.get(), _root.get()
+    if spans is None or start is None:
+        return
+    _spans.set(None)
+    _root.set(None)
+    traces.append({'name': name, 'time': time.time(), 'duration': time.perf_counter() - start, 'spans': spans})
+
+# Total and self time per span path. Spans of parallel tasks overlap, so self time is clamped at zero.
+def breakdown(trace):
+    totals = collections.defaultdict(float)
+    counts = collections.defaultdict(int)
+    first = {}
+    for path, start, duration in trace['spans']:
+        totals[path] += duration
+        counts[path] += 1
+        first.setdefault(path, start)
+    children = collections.defaultdict(float)
+    for path, total in totals.items():
+        children[path[:-1]] += total
+    self_times = {path: max(total - children[path], 0) for path, total in totals.items()}
+    # The rest of the request: Dash dispatch and JSON serialization of the outputs
+    self_times[()] = max(trace['duration'] - children[()], 0)
+    return totals, counts, self_times, first
+
+def render_tree(trace, width=40):
+    totals, counts, self_times, first = breakdown(trace)
+    duration = trace['duration']
+    lines = [f'{trace["name"]}  {duration * 1000:.1f} ms  {time.strftime("%H:%M:%S", time.localtime(trace["time"]))}']
+    def bar(seconds):
+        return '#' * max(1, round(width * seconds / duration)) if duration else ''
+    # Children are listed under their parent in the order they first started
+    for path in sorted(totals, key=lambda path: [first[path[:depth]] for depth in range(1, len(path) + 1)]):
+        label = '  ' * len(path) + path[-1] + (f' x{counts[path]}' if counts[path] > 1 else '')
+        lines.append(f'{label:<50} {totals[path] * 1000:8.2f} ms  {bar(totals[path])}')
+    lines.append(f'{"  dispatch and serialization":<50} {self_times[()] * 1000:8.2f} ms  {bar(self_times[()])}')
+    return '\n'.join(lines)
+
+# Folded stacks ("a;b;c microseconds") of self time, for flamegraph.pl or speedscope
+def render_folded(trace_list):
+    folded = collections.defaultdict(float)
+    for trace in trace_list:
+        _, _, self_times, _ = breakdown(trace)
+        for path, seconds in self_times.items():
+            folded[';'.join((trace['name'],) + path)] += seconds
+    return '\n'.join(f'{stack} {round(seconds * 1e6)}' for stack, seconds in sorted(folded.items()) if seconds) + '\n'
+
+_switch_lock = threading.Lock()
+_switch_checked = 0
+_switch_version = None
+
+def switch_path():
+    directory = shared_dir()
+    return os.path.join(directory, 'tracing.json') if directory else None
+
+# Takes over the switch of the other workers once it changed
+def sync_switch():
+    global enabled, _switch_checked, _switch_version
+    path = switch_path()
+    now = time.monotonic()
+    if path is None or now - _switch_checked < SWITCH_CHECK_INTERVAL:
+        return
+    with _switch_lock:
+        _switch_checked = now
+        try:
+            status = os.stat(path)
+            if (status.st_ino, status.st_mtime_ns) == _switch_version:
+                return
+            with open(path) as file:
+                switched_on = json.load(file)['enabled']
+        except (OSError, ValueError, KeyError):
+            return
+        _switch_version = (status.st_ino, status.st_mtime_ns)
+        enabled = switched_on
+        if not enabled:
+            traces.clear()
+
+def switch(switched_on):
+    global enabled
+    with _switch_lock:
+        enabled = switched_on
+        if not enabled:
+            traces.clear()
+        path = switch_path()
+        if path is not None:
+            write_json(path, {'enabled': switched_on})
+
+# Bytes of the kept traces
+def memory_usage():
+    return {'caches': {'trace history': deep_size(list(traces))}}
+
+# Traces the server-side callback requests of a Dash app and serves the recent traces at path
+def init_tracing(app, path='/tracing'):
+    server = app.server
+
+    @server.before_request
+    def start_request_trace():
+        if request.path.endswith('/_dash-update-component'):
+            sync_switch()
+            start_trace()
+
+    @server.after_request
+    def finish_request_trace(response):
+        if _spans.get() is not None:
+            output = (request.get_json(silent=True) or {}).get('output', '')
+            callback = app.callback_map.get(output, {}).get('callback')
+            finish_trace(getattr(callback, '__name__', output or 'unknown'))
+        return response
+
+    @server.route(path, methods=['GET', 'POST'])
+    @admin_only
+    def tracing():
+        if request.method == 'POST':
+            switch(request.values.get('enabled', '1') == '1')
+        else:
+            sync_switch()
+        recent = list(traces)
+        if request.args.get('format') == 'folded':
+            return Response(render_folded(recent), mimetype='text/plain')
+        header = f'tracing {"on" if enabled else "off"}, {len(recent)} recent requests of worker {os.getpid()}\n\n'
+        return Response(header + '\n\n'.join(render_tree(trace) for trace in reversed(recent)) + '\n',
+                        mimetype='text/plain')
@@ -0,0 +1,21 @@
+import gc
+import importlib
+import os
+
+# Production entry point for a pre-forking WSGI server, see gunicorn.conf.py:
+#
+#   gunicorn -c gunicorn.conf.py wsgi:server
+#
+# With preload_app the dashboard module, and with it the run data, indexes and prebuilt layouts,
+# is imported once in the master process. Forked workers share those pages copy-on-write. With
+# AGGREGATION_BACKEND=polars every worker imports it itself, see gunicorn.conf.py.
+# One app serves every theme; DASH_THEME sets the one new sessions start with.
+DESIGN = os.environ.get('DASH_DESIGN', 'dashboard')
+
+design = importlib.import_module(DESIGN)
+app = design.app
+server = app.server
+
+# Move everything loaded so far out of the collector's generations. Otherwise the first collection
+# in each worker writes to the headers of all these objects and copies their pages after all.
+gc.freeze()